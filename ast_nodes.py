@@ -3,27 +3,80 @@ AST (Abstract Syntax Tree) nodes for Go-Extended
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Optional, Any, Dict
-from dataclasses import dataclass
+from enum import IntEnum, auto
+from typing import Tuple, Optional, Any, Dict, ClassVar, Iterator, Callable, Sequence, Union, cast, get_args, get_origin, get_type_hints
+from dataclasses import dataclass, fields
+from weakref import WeakValueDictionary
+
+class NodeKind(IntEnum):
+    """Integer tag of each concrete node class, for table dispatch"""
+    PROGRAM = auto()
+    IMPORT_DECL = auto()
+    FUNC_DECL = auto()
+    VAR_DECL = auto()
+    CONST_DECL = auto()
+    TYPE_DECL = auto()
+    STRUCT_DECL = auto()
+    INTERFACE_DECL = auto()
+    CLASS_DECL = auto()
+    CLASS_FIELD = auto()
+    CONSTRUCTOR_DECL = auto()
+    PARAMETER = auto()
+    STRUCT_FIELD = auto()
+    METHOD_SIGNATURE = auto()
+    BLOCK_STMT = auto()
+    EXPRESSION_STMT = auto()
+    ASSIGN_STMT = auto()
+    IF_STMT = auto()
+    FOR_STMT = auto()
+    RANGE_STMT = auto()
+    SWITCH_STMT = auto()
+    CASE_STMT = auto()
+    DEFAULT_STMT = auto()
+    RETURN_STMT = auto()
+    BREAK_STMT = auto()
+    CONTINUE_STMT = auto()
+    GO_STMT = auto()
+    DEFER_STMT = auto()
+    TRY_STMT = auto()
+    CATCH_STMT = auto()
+    FINALLY_STMT = auto()
+    THROW_STMT = auto()
+    BINARY_EXPR = auto()
+    UNARY_EXPR = auto()
+    CALL_EXPR = auto()
+    INDEX_EXPR = auto()
+    SELECTOR_EXPR = auto()
+    IDENTIFIER = auto()
+    LITERAL = auto()
+    ARRAY_LITERAL = auto()
+    MAP_LITERAL = auto()
+    STRUCT_LITERAL = auto()
+    NEW_EXPR = auto()
+    THIS_EXPR = auto()
+    SUPER_EXPR = auto()
 
 class ASTNode(ABC):
     """Base class for all AST nodes"""
-    pass
+    __slots__ = ()
+    KIND: ClassVar[NodeKind]
 
 # ============================================================================
 # Program and Declarations
 # ============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class Program(ASTNode):
     """Main program"""
+    KIND = NodeKind.PROGRAM
     package: str
-    imports: List['ImportDecl']
-    declarations: List['Declaration']
+    imports: Tuple['ImportDecl', ...]
+    declarations: Tuple['Declaration', ...]
 
-@dataclass
+@dataclass(slots=True)
 class ImportDecl(ASTNode):
     """Import declaration"""
+    KIND = NodeKind.IMPORT_DECL
     path: str
     alias: Optional[str] = None
 
@@ -33,103 +86,100 @@ class ImportDecl(ASTNode):
 
 class Declaration(ASTNode):
     """Base class for declarations"""
-    pass
+    __slots__ = ()
 
-@dataclass
+@dataclass(slots=True)
 class FuncDecl(Declaration):
-    """Function declaration"""
+    """Function declaration, or a method when it has a receiver class"""
+    KIND = NodeKind.FUNC_DECL
     name: str
-    params: List['Parameter']
+    params: Tuple['Parameter', ...]
     return_type: Optional[str]
     body: 'BlockStmt'
+    receiver: Optional[str] = None
 
-@dataclass
-class VarDecl(Declaration):
-    """Variable declaration"""
-    name: str
-    type: Optional[str]
-    value: Optional['Expression']
-
-@dataclass
+@dataclass(slots=True)
 class ConstDecl(Declaration):
     """Constant declaration"""
+    KIND = NodeKind.CONST_DECL
     name: str
     type: Optional[str]
     value: 'Expression'
 
-@dataclass
+@dataclass(slots=True)
 class TypeDecl(Declaration):
     """Type declaration"""
+    KIND = NodeKind.TYPE_DECL
     name: str
     type: str
 
-@dataclass
+@dataclass(slots=True)
 class StructDecl(Declaration):
     """Struct declaration"""
+    KIND = NodeKind.STRUCT_DECL
     name: str
-    fields: List['StructField']
+    fields: Tuple['StructField', ...]
 
-@dataclass
+@dataclass(slots=True)
 class InterfaceDecl(Declaration):
     """Interface declaration"""
+    KIND = NodeKind.INTERFACE_DECL
     name: str
-    methods: List['MethodSignature']
+    methods: Tuple['MethodSignature', ...]
 
 # ============================================================================
 # Extensions - Classes
 # ============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class ClassDecl(Declaration):
     """Class declaration (extension)"""
+    KIND = NodeKind.CLASS_DECL
     name: str
     extends: Optional[str]
-    fields: List['ClassField']
-    methods: List['MethodDecl']
+    fields: Tuple['ClassField', ...]
+    methods: Tuple['FuncDecl', ...]
     constructor: Optional['ConstructorDecl']
 
-@dataclass
+@dataclass(slots=True)
 class ClassField(ASTNode):
     """Class field"""
+    KIND = NodeKind.CLASS_FIELD
     name: str
     type: str
     value: Optional['Expression'] = None
 
-@dataclass
-class MethodDecl(ASTNode):
-    """Method declaration"""
-    name: str
-    params: List['Parameter']
-    return_type: Optional[str]
-    body: 'BlockStmt'
-
-@dataclass
+@dataclass(slots=True)
 class ConstructorDecl(ASTNode):
     """Constructor declaration"""
-    params: List['Parameter']
+    KIND = NodeKind.CONSTRUCTOR_DECL
+    params: Tuple['Parameter', ...]
     body: 'BlockStmt'
 
 # ============================================================================
 # Parameters and Fields
 # ============================================================================
 
-@dataclass
+@dataclass(slots=True, weakref_slot=True)
 class Parameter(ASTNode):
     """Function parameter"""
+    KIND = NodeKind.PARAMETER
     name: str
     type: str
 
-@dataclass
+@dataclass(slots=True)
 class StructField(ASTNode):
     """Struct field"""
+    KIND = NodeKind.STRUCT_FIELD
     name: str
     type: str
 
-@dataclass
+@dataclass(slots=True)
 class MethodSignature(ASTNode):
     """Method signature (interface)"""
+    KIND = NodeKind.METHOD_SIGNATURE
     name: str
-    params: List['Parameter']
+    params: Tuple['Parameter', ...]
     return_type: Optional[str]
 
 # ============================================================================
@@ -138,124 +188,141 @@ class MethodSignature(ASTNode):
 
 class Statement(ASTNode):
     """Base class for statements"""
-    pass
+    __slots__ = ()
 
-@dataclass
+@dataclass(slots=True)
 class BlockStmt(Statement):
     """Block of statements"""
-    statements: List[Statement]
+    KIND = NodeKind.BLOCK_STMT
+    statements: Tuple[Statement, ...]
 
-@dataclass
+@dataclass(slots=True)
 class ExpressionStmt(Statement):
     """Expression statement"""
+    KIND = NodeKind.EXPRESSION_STMT
     expression: 'Expression'
 
-@dataclass
-class VarStmt(Statement):
-    """Variable declaration statement"""
+@dataclass(slots=True)
+class VarDecl(Declaration, Statement):
+    """Variable declaration, at top level or as a statement"""
+    KIND = NodeKind.VAR_DECL
     name: str
     type: Optional[str]
     value: Optional['Expression']
 
-@dataclass
+@dataclass(slots=True)
 class AssignStmt(Statement):
     """Assignment statement"""
+    KIND = NodeKind.ASSIGN_STMT
     target: 'Expression'
     value: 'Expression'
     operator: str = '='
 
-@dataclass
+@dataclass(slots=True)
 class IfStmt(Statement):
     """If statement"""
+    KIND = NodeKind.IF_STMT
     condition: 'Expression'
     then_stmt: Statement
     else_stmt: Optional[Statement] = None
 
-@dataclass
+@dataclass(slots=True)
 class ForStmt(Statement):
     """For statement"""
+    KIND = NodeKind.FOR_STMT
     init: Optional[Statement]
     condition: Optional['Expression']
     update: Optional[Statement]
     body: Statement
 
-@dataclass
+@dataclass(slots=True)
 class RangeStmt(Statement):
     """For range statement"""
+    KIND = NodeKind.RANGE_STMT
     key: Optional[str]
     value: Optional[str]
     iterable: 'Expression'
     body: Statement
 
-@dataclass
+@dataclass(slots=True)
 class SwitchStmt(Statement):
     """Switch statement"""
+    KIND = NodeKind.SWITCH_STMT
     expression: Optional['Expression']
-    cases: List['CaseStmt']
+    cases: Tuple['CaseStmt', ...]
     default_case: Optional['DefaultStmt']
 
-@dataclass
+@dataclass(slots=True)
 class CaseStmt(Statement):
     """Switch case"""
-    values: List['Expression']
-    body: List[Statement]
+    KIND = NodeKind.CASE_STMT
+    values: Tuple['Expression', ...]
+    body: Tuple[Statement, ...]
 
-@dataclass
+@dataclass(slots=True)
 class DefaultStmt(Statement):
     """Switch default"""
-    body: List[Statement]
+    KIND = NodeKind.DEFAULT_STMT
+    body: Tuple[Statement, ...]
 
-@dataclass
+@dataclass(slots=True)
 class ReturnStmt(Statement):
     """Return statement"""
+    KIND = NodeKind.RETURN_STMT
     value: Optional['Expression'] = None
 
-@dataclass
+@dataclass(slots=True)
 class BreakStmt(Statement):
     """Break statement"""
-    pass
+    KIND = NodeKind.BREAK_STMT
 
-@dataclass
+@dataclass(slots=True)
 class ContinueStmt(Statement):
     """Continue statement"""
-    pass
+    KIND = NodeKind.CONTINUE_STMT
 
-@dataclass
+@dataclass(slots=True)
 class GoStmt(Statement):
     """Go statement (goroutine)"""
+    KIND = NodeKind.GO_STMT
     call: 'CallExpr'
 
-@dataclass
+@dataclass(slots=True)
 class DeferStmt(Statement):
     """Defer statement"""
+    KIND = NodeKind.DEFER_STMT
     call: 'CallExpr'
 
 # ============================================================================
 # Extensions - Exception Handling
 # ============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class TryStmt(Statement):
     """Try statement (extension)"""
+    KIND = NodeKind.TRY_STMT
     body: BlockStmt
-    catch_blocks: List['CatchStmt']
+    catch_blocks: Tuple['CatchStmt', ...]
     finally_block: Optional['FinallyStmt'] = None
 
-@dataclass
+@dataclass(slots=True)
 class CatchStmt(Statement):
     """Catch statement (extension)"""
+    KIND = NodeKind.CATCH_STMT
     exception_type: Optional[str]
     exception_var: Optional[str]
     body: BlockStmt
 
-@dataclass
+@dataclass(slots=True)
 class FinallyStmt(Statement):
     """Finally statement (extension)"""
+    KIND = NodeKind.FINALLY_STMT
     body: BlockStmt
 
-@dataclass
+@dataclass(slots=True)
 class ThrowStmt(Statement):
     """Throw statement (extension)"""
+    KIND = NodeKind.THROW_STMT
     expression: 'Expression'
 
 # ============================================================================
@@ -264,85 +331,200 @@ class ThrowStmt(Statement):
 
 class Expression(ASTNode):
     """Base class for expressions"""
-    pass
+    __slots__ = ()
 
-@dataclass
+@dataclass(slots=True, eq=False)
 class BinaryExpr(Expression):
     """Binary expression"""
+    KIND = NodeKind.BINARY_EXPR
     left: Expression
     operator: str
     right: Expression
 
-@dataclass
+@dataclass(slots=True)
 class UnaryExpr(Expression):
     """Unary expression"""
+    KIND = NodeKind.UNARY_EXPR
     operator: str
     operand: Expression
 
-@dataclass
+@dataclass(slots=True, eq=False)
 class CallExpr(Expression):
     """Function call"""
+    KIND = NodeKind.CALL_EXPR
     function: Expression
-    args: List[Expression]
+    args: Tuple[Expression, ...]
 
-@dataclass
+@dataclass(slots=True)
 class IndexExpr(Expression):
     """Index access (array/slice/map)"""
+    KIND = NodeKind.INDEX_EXPR
     object: Expression
     index: Expression
 
-@dataclass
+@dataclass(slots=True)
 class SelectorExpr(Expression):
     """Selector (obj.field)"""
+    KIND = NodeKind.SELECTOR_EXPR
     object: Expression
     field: str
 
-@dataclass
+@dataclass(slots=True, eq=False, weakref_slot=True)
 class Identifier(Expression):
     """Identifier"""
+    KIND = NodeKind.IDENTIFIER
     name: str
 
-@dataclass
+@dataclass(slots=True, eq=False, weakref_slot=True)
 class Literal(Expression):
     """Literal (number, string, boolean)"""
+    KIND = NodeKind.LITERAL
     value: Any
     type: str  # 'int', 'float', 'string', 'bool'
 
-@dataclass
+@dataclass(slots=True)
 class ArrayLiteral(Expression):
     """Array literal"""
-    elements: List[Expression]
+    KIND = NodeKind.ARRAY_LITERAL
+    elements: Tuple[Expression, ...]
     type: Optional[str] = None
 
-@dataclass
+@dataclass(slots=True)
 class MapLiteral(Expression):
     """Map literal"""
-    pairs: List[tuple[Expression, Expression]]
+    KIND = NodeKind.MAP_LITERAL
+    pairs: Tuple[Tuple[Expression, Expression], ...]
     key_type: Optional[str] = None
     value_type: Optional[str] = None
 
-@dataclass
+@dataclass(slots=True)
 class StructLiteral(Expression):
     """Struct literal"""
+    KIND = NodeKind.STRUCT_LITERAL
     type: str
-    fields: List[tuple[str, Expression]]
+    fields: Tuple[Tuple[str, Expression], ...]
 
 # ============================================================================
 # Extensions - Class Expressions
 # ============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class NewExpr(Expression):
     """New expression (extension)"""
+    KIND = NodeKind.NEW_EXPR
     class_name: str
-    args: List[Expression]
+    args: Tuple[Expression, ...]
 
-@dataclass
+@dataclass(slots=True)
 class ThisExpr(Expression):
     """This expression (extension)"""
-    pass
+    KIND = NodeKind.THIS_EXPR
 
-@dataclass
+@dataclass(slots=True)
 class SuperExpr(Expression):
     """Super expression (extension)"""
-    pass
+    KIND = NodeKind.SUPER_EXPR
+
+# ============================================================================
+# Shared leaf nodes
+# ============================================================================
+
+# Leaves are hash-consed: equal parameters, identifiers and literals are
+# one object, so the nodes must be treated as immutable once built
+_parameters: 'WeakValueDictionary[tuple[str, str], Parameter]' = WeakValueDictionary()
+_identifiers: 'WeakValueDictionary[str, Identifier]' = WeakValueDictionary()
+_literals: 'WeakValueDictionary[tuple[str, Any], Literal]' = WeakValueDictionary()
+
+def mk_parameter(name: str, type: str) -> Parameter:
+    """Returns the shared parameter node for name and type"""
+    node = _parameters.get((name, type))
+    if node is None:
+        node = _parameters[(name, type)] = Parameter(name, type)
+    return node
+
+def mk_identifier(name: str) -> Identifier:
+    """Returns the shared identifier node for name"""
+    node = _identifiers.get(name)
+    if node is None:
+        node = _identifiers[name] = Identifier(name)
+    return node
+
+def mk_literal(value: Any, type: str) -> Literal:
+    """Returns the shared literal node for value and type"""
+    node = _literals.get((type, value))
+    if node is None:
+        node = _literals[(type, value)] = Literal(value, type)
+    return node
+
+# Nodes without fields are all alike, so one instance of each is enough
+BREAK_STMT = BreakStmt()
+CONTINUE_STMT = ContinueStmt()
+THIS_EXPR = ThisExpr()
+SUPER_EXPR = SuperExpr()
+
+# ============================================================================
+# Tree walking
+# ============================================================================
+
+# Field names of each node class, filled in on first use
+_field_names: Dict[type, Tuple[str, ...]] = {}
+
+def node_fields(cls: type) -> Tuple[str, ...]:
+    """Returns the field names of a node class"""
+    names = _field_names.get(cls)
+    if names is None:
+        names = _field_names[cls] = tuple(f.name for f in fields(cls))
+    return names
+
+def _is_node_type(hint: Any) -> bool:
+    """Checks if a type hint names a node class"""
+    return isinstance(hint, type) and issubclass(hint, ASTNode)
+
+def _compile_children(cls: type) -> Callable[[Any], Sequence[ASTNode]]:
+    """Generates a function returning the child nodes of a node class, from
+    the field annotations: nodes, optional nodes, tuples of nodes and the
+    nodes in tuples of fixed-size tuples (map pairs, struct fields)"""
+    hints = get_type_hints(cls)
+    lines = []
+    for f in fields(cls):
+        hint = hints[f.name]
+        args = get_args(hint)
+        if get_origin(hint) is Union and any(_is_node_type(arg) for arg in args):
+            hint = next(arg for arg in args if _is_node_type(arg))
+        if _is_node_type(hint):
+            lines += [f"    child = node.{f.name}", "    if child is not None:", "        children.append(child)"]
+        elif get_origin(hint) is tuple and args and _is_node_type(args[0]):
+            lines.append(f"    children.extend(node.{f.name})")
+        elif get_origin(hint) is tuple and args and get_origin(args[0]) is tuple:
+            positions = [i for i, arg in enumerate(get_args(args[0])) if _is_node_type(arg)]
+            if positions:
+                lines.append(f"    for item in node.{f.name}:")
+                lines += [f"        children.append(item[{i}])" for i in positions]
+    if not lines:
+        return lambda node: ()
+    
+    source = '\n'.join(["def children_of(node):", "    children = []", *lines, "    return children"])
+    namespace: Dict[str, Any] = {}
+    exec(source, namespace)
+    return cast(Callable[[Any], Sequence[ASTNode]], namespace['children_of'])
+
+# Child node getters of each node class, generated on first use
+_children_getters: Dict[type, Callable[[Any], Sequence[ASTNode]]] = {}
+
+def children(node: ASTNode) -> Sequence[ASTNode]:
+    """Returns the direct child nodes of a node"""
+    cls = type(node)
+    getter = _children_getters.get(cls)
+    if getter is None:
+        getter = _children_getters[cls] = _compile_children(cls)
+    return getter(node)
+
+def walk(root: ASTNode) -> Iterator[ASTNode]:
+    """Yields root and every node below it (siblings in no particular order)"""
+    getters = _children_getters
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        yield node
+        getter = getters.get(type(node))
+        stack.extend(getter(node) if getter is not None else children(node))
@@ -0,0 +1,127 @@
+"""
+Build cache for Go-Extended
+Stores parsed ASTs and generated code on disk, keyed by a hash of the
+source code
+"""
+
+import os
+import pickle
+import hashlib
+import tempfile
+from pathlib import Path
+from typing import Optional, Set
+from ast_nodes import Program
+
+# Bump whenever the AST layout or the generated code changes, so stale
+# entries (and build manifests) are never used
+CACHE_VERSION = 4
+
+def source_hash(source: str) -> str:
+    """Returns the hash identifying the source code for this version"""
+    digest = hashlib.blake2b(source.encode('utf-8'), digest_size=16)
+    digest.update(CACHE_VERSION.to_bytes(4, 'little'))
+    return digest.hexdigest()
+
+def default_cache_dir() -> Path:
+    """Returns the user cache directory for goe2go"""
+    base = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(base) / 'goe2go'
+
+def write_atomic(path: Path, data: bytes) -> None:
+    """Writes data to a temporary file next to path and renames it into place,
+    so readers never see a partial file; an existing file keeps its mode"""
+    try:
+        mode = os.stat(path).st_mode & 0o7777
+    except OSError:
+        # New files get the mode open() would give them
+        umask = os.umask(0)
+        os.umask(umask)
+        mode = 0o666 & ~umask
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        # mkstemp creates the file readable by its owner only
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+def _store_atomic(directory: Path, name: str, data: bytes) -> None:
+    """Writes data to directory/name; failures are ignored"""
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+        write_atomic(directory / name, data)
+    except OSError:
+        pass
+
+def _prune(directory: Path, suffix: str, keep: Set[str]) -> None:
+    """Removes the entries of directory whose keys are not in keep; failures
+    are ignored"""
+    try:
+        entries = list(directory.iterdir())
+    except OSError:
+        return
+    for entry in entries:
+        if entry.suffix == suffix and entry.stem not in keep:
+            try:
+                entry.unlink()
+            except OSError:
+                pass
+
+class ASTCache:
+    """On-disk cache mapping source code hashes to parsed programs"""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory) / 'ast'
+
+    def key(self, source: str) -> str:
+        """Returns the cache key for the source code"""
+        return source_hash(source)
+
+    def load(self, source: str) -> Optional[Program]:
+        """Returns the cached program for the source, or None on a miss"""
+        try:
+            with open(self.directory / f"{self.key(source)}.pkl", 'rb') as f:
+                program = pickle.load(f)
+        except Exception:
+            # Missing, unreadable or corrupt entries are all misses
+            return None
+        return program if isinstance(program, Program) else None
+
+    def store(self, source: str, program: Program) -> None:
+        """Stores the program for the source; failures are ignored"""
+        try:
+            data = pickle.dumps(program, pickle.HIGHEST_PROTOCOL)
+        except (RecursionError, pickle.PicklingError):
+            # Pickling recurses once per tree level, so very deep programs
+            # (long expression chains) are simply not cached
+            return
+        _store_atomic(self.directory, f"{self.key(source)}.pkl", data)
+
+    def prune(self, keep: Set[str]) -> None:
+        """Removes the entries whose keys are not in keep"""
+        _prune(self.directory, '.pkl', keep)
+
+class OutputCache:
+    """On-disk cache mapping transpilation keys to generated Go code"""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory) / 'go'
+
+    def load(self, key: str) -> Optional[str]:
+        """Returns the cached Go code for the key, or None on a miss"""
+        try:
+            with open(self.directory / f"{key}.go", 'r', encoding='utf-8', newline='') as f:
+                return f.read()
+        except (OSError, ValueError):
+            return None
+
+    def store(self, key: str, go_code: str) -> None:
+        """Stores the Go code for the key; failures are ignored"""
+        _store_atomic(self.directory, f"{key}.go", go_code.encode('utf-8'))
+
+    def prune(self, keep: Set[str]) -> None:
+        """Removes the entries whose keys are not in keep"""
+        _prune(self.directory, '.go', keep)
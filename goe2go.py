@@ -8,7 +8,7 @@ import sys
 import argparse
 from pathlib import Path
 from project_manager import ProjectManager
-from main import main as transpile_single_file
+from main import transpile_single_file
 
 def cmd_init(args):
     """Initialize a new project"""
@@ -21,7 +21,7 @@ def cmd_init(args):
 def cmd_build(args):
     """Build the project"""
     project_root = Path(args.directory) if args.directory else Path.cwd()
-    manager = ProjectManager(project_root)
+    manager = ProjectManager(project_root, use_cache=not args.no_cache)
     
     try:
         manager.transpile_project()
@@ -31,6 +31,8 @@ def cmd_build(args):
             import traceback
             traceback.print_exc()
         sys.exit(1)
+    
+    return manager
 
 def cmd_info(args):
     """Show project information"""
@@ -47,43 +49,22 @@ def cmd_info(args):
 
 def cmd_transpile(args):
     """Transpile a single file"""
-    # Reuse existing functionality
-    sys.argv = ['main.py', args.input]
-    if args.output:
-        sys.argv.extend(['-o', args.output])
-    if args.verbose:
-        sys.argv.append('-v')
-    
-    transpile_single_file()
+    output_file = Path(args.output) if args.output else None
+    transpile_single_file(Path(args.input), output_file, args.verbose, args.cache)
 
 def cmd_run(args):
     """Build and run the project"""
     import subprocess
     
-    # First build
-    cmd_build(args)
-    
-    # Then run
-    project_root = Path(args.directory) if args.directory else Path.cwd()
-    manager = ProjectManager(project_root)
-    config = manager.load_config()
-    
-    build_dir = project_root / config.output_dir
-    main_file = None
-    
-    # Search for main file
-    for go_file in build_dir.rglob("*.go"):
-        with open(go_file, 'r') as f:
-            content = f.read()
-            if 'package main' in content and 'func main()' in content:
-                main_file = go_file
-                break
+    # First build; the build records which generated file declares main
+    manager = cmd_build(args)
+    main_file = manager.main_file
     
     if not main_file:
         print("Main file not found")
         sys.exit(1)
     
-    print(f"Running {main_file.relative_to(project_root)}...")
+    print(f"Running {main_file.relative_to(manager.project_root)}...")
     try:
         result = subprocess.run(['go', 'run', main_file.name], 
                               cwd=main_file.parent, 
@@ -127,12 +108,14 @@ Examples:
     build_parser = subparsers.add_parser('build', help='Build the project')
     build_parser.add_argument('-d', '--directory', help='Project directory')
     build_parser.add_argument('-v', '--verbose', action='store_true', help='Verbose mode')
+    build_parser.add_argument('--no-cache', action='store_true', help='Do not use the AST and output caches or the build manifest')
     build_parser.set_defaults(func=cmd_build)
     
     # Run command
     run_parser = subparsers.add_parser('run', help='Build and run the project')
     run_parser.add_argument('-d', '--directory', help='Project directory')
     run_parser.add_argument('-v', '--verbose', action='store_true', help='Verbose mode')
+    run_parser.add_argument('--no-cache', action='store_true', help='Do not use the AST and output caches or the build manifest')
     run_parser.set_defaults(func=cmd_run)
     
     # Info command
@@ -146,6 +129,7 @@ Examples:
     transpile_parser.add_argument('input', help='Input Go-Extended file')
     transpile_parser.add_argument('-o', '--output', help='Output Go file')
     transpile_parser.add_argument('-v', '--verbose', action='store_true', help='Verbose mode')
+    transpile_parser.add_argument('--cache', action='store_true', help='Cache the parsed AST in the user cache directory')
     transpile_parser.set_defaults(func=cmd_transpile)
     
     args = parser.parse_args()
@@ -4,196 +4,147 @@ Converts source code into tokens
 """
 
 import re
-from typing import List, Optional
-from tokens import Token, TokenType, KEYWORDS, TWO_CHAR_OPERATORS, ONE_CHAR_OPERATORS
+import sys
+from typing import List
+from tokens import TokenArray, TokenType, KEYWORDS, TWO_CHAR_OPERATORS, ONE_CHAR_OPERATORS
 
 class LexerError(Exception):
     """Lexer error"""
     pass
 
+# Basic escape sequences; any other escaped character stands for itself
+ESCAPE_CHARS = {
+    'n': '\n',
+    't': '\t',
+    'r': '\r',
+    '\\': '\\',
+    '"': '"',
+    "'": "'",
+}
+
+# Packed type tags (see TokenArray) for the lexer's inner loop. Operators
+# share one table, two-character ones first so they win in the pattern.
+_KEYWORD_TAGS = {word: token_type.value for word, token_type in KEYWORDS.items()}
+_OPERATOR_TAGS = {op: token_type.value for op, token_type in [*TWO_CHAR_OPERATORS.items(), *ONE_CHAR_OPERATORS.items()]}
+_IDENTIFIER_TAG = TokenType.IDENTIFIER.value
+_NUMBER_TAG = TokenType.NUMBER.value
+_STRING_TAG = TokenType.STRING.value
+_COMMENT_TAG = TokenType.COMMENT.value
+_NEWLINE_TAG = TokenType.NEWLINE.value
+
+# Token patterns, tried in order at each position. The UNCLOSED_* and
+# MISMATCH groups only match where no complete token starts.
+TOKEN_SPECS = [
+    ('WS', r'[ \t\r]+'),
+    ('NL', r'\n'),
+    ('LINE_COMMENT', r'//[^\n]*'),
+    ('BLOCK_COMMENT', r'/\*.*?\*/'),
+    ('STRING', r'"(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\''),
+    ('NUMBER', r'\d+(?:\.\d*)?'),
+    ('IDENT', r'[^\W\d]\w*'),
+    ('UNCLOSED_STRING', r'["\']'),
+    ('UNCLOSED_COMMENT', r'/\*'),
+    ('OP', '|'.join(re.escape(op) for op in _OPERATOR_TAGS)),
+    ('MISMATCH', r'.'),
+]
+
+_MASTER_RE = re.compile('|'.join(f'(?P<{name}>{pattern})' for name, pattern in TOKEN_SPECS), re.DOTALL)
+
+def _unescape(body: str) -> str:
+    """Resolves the escape sequences of a string literal body"""
+    # The string pattern guarantees every backslash is followed by a character
+    segments = []
+    start = 0
+    i = body.find('\\')
+    while i != -1:
+        segments.append(body[start:i])
+        char = body[i + 1]
+        segments.append(ESCAPE_CHARS.get(char, char))
+        start = i + 2
+        i = body.find('\\', start)
+    segments.append(body[start:])
+    return ''.join(segments)
+
+def line_starts(source: str) -> List[int]:
+    """Returns the offset at which each line of the source starts"""
+    starts = [0]
+    i = source.find('\n')
+    while i != -1:
+        starts.append(i + 1)
+        i = source.find('\n', i + 1)
+    return starts
+
 class Lexer:
     def __init__(self, source: str):
         self.source = source
-        self.pos = 0
-        self.line = 1
-        self.column = 1
-        self.tokens: List[Token] = []
-    
-    def current_char(self) -> Optional[str]:
-        """Returns the current character or None if end of file"""
-        if self.pos >= len(self.source):
-            return None
-        return self.source[self.pos]
-    
-    def peek_char(self, offset: int = 1) -> Optional[str]:
-        """Peeks at the next character without advancing"""
-        peek_pos = self.pos + offset
-        if peek_pos >= len(self.source):
-            return None
-        return self.source[peek_pos]
-    
-    def advance(self) -> None:
-        """Advances to the next character"""
-        if self.pos < len(self.source):
-            if self.source[self.pos] == '\n':
-                self.line += 1
-                self.column = 1
-            else:
-                self.column += 1
-            self.pos += 1
-    
-    def skip_whitespace(self) -> None:
-        """Skips whitespace (except newlines)"""
-        while self.current_char() and self.current_char() in ' \t\r':
-            self.advance()
-    
-    def read_string(self, quote_char: str) -> str:
-        """Reads a string literal"""
-        value = ''
-        self.advance()  # Skip the opening quote
-        
-        while self.current_char() and self.current_char() != quote_char:
-            if self.current_char() == '\\':
-                self.advance()
-                if self.current_char():
-                    # Basic escape sequences
-                    escape_chars = {
-                        'n': '\n',
-                        't': '\t',
-                        'r': '\r',
-                        '\\': '\\',
-                        '"': '"',
-                        "'": "'",
-                    }
-                    value += escape_chars.get(self.current_char(), self.current_char())
-                    self.advance()
-            else:
-                value += self.current_char()
-                self.advance()
-        
-        if not self.current_char():
-            raise LexerError(f"Unclosed string at line {self.line}")
-        
-        self.advance()  # Skip the closing quote
-        return value
-    
-    def read_number(self) -> str:
-        """Reads a number (int or float)"""
-        value = ''
-        has_dot = False
-        
-        while self.current_char() and (self.current_char().isdigit() or self.current_char() == '.'):
-            if self.current_char() == '.':
-                if has_dot:
-                    break  # Second dot, stop reading
-                has_dot = True
-            value += self.current_char()
-            self.advance()
-        
-        return value
-    
-    def read_identifier(self) -> str:
-        """Reads an identifier or keyword"""
-        value = ''
-        
-        while (self.current_char() and 
-               (self.current_char().isalnum() or self.current_char() == '_')):
-            value += self.current_char()
-            self.advance()
-        
-        return value
-    
-    def read_comment(self) -> str:
-        """Reads a comment"""
-        value = ''
-        
-        if self.current_char() == '/' and self.peek_char() == '/':
-            # Line comment
-            while self.current_char() and self.current_char() != '\n':
-                value += self.current_char()
-                self.advance()
-        elif self.current_char() == '/' and self.peek_char() == '*':
-            # Block comment
-            self.advance()  # /
-            self.advance()  # *
-            value = '/*'
-            
-            while self.current_char():
-                if self.current_char() == '*' and self.peek_char() == '/':
-                    value += '*/'
-                    self.advance()  # *
-                    self.advance()  # /
-                    break
-                value += self.current_char()
-                self.advance()
-            else:
-                raise LexerError(f"Unclosed block comment at line {self.line}")
-        
-        return value
-    
-    def tokenize(self) -> List[Token]:
+        self.tokens = TokenArray()
+
+    def tokenize(self) -> TokenArray:
         """Tokenizes the source code"""
-        self.tokens = []
-        
-        while self.current_char():
-            start_line = self.line
-            start_column = self.column
-            
-            # Skip whitespace
-            if self.current_char() in ' \t\r':
-                self.skip_whitespace()
+        self.tokens = TokenArray(line_starts(self.source))
+        add_type = self.tokens.types.append
+        add_value = self.tokens.values.append
+        add_position = self.tokens.positions.append
+        keyword_tags = _KEYWORD_TAGS
+        operator_tags = _OPERATOR_TAGS
+        intern = sys.intern
+        source = self.source
+
+        for m in _MASTER_RE.finditer(source):
+            kind = m.lastgroup
+            if kind == 'WS':
                 continue
-            
+
+            text = m.group()
+
+            # Identifiers and keywords (interned, as the same names recur
+            # throughout a file)
+            if kind == 'IDENT':
+                tag = keyword_tags.get(text, _IDENTIFIER_TAG)
+                value = intern(text)
+
+            # Operators
+            elif kind == 'OP':
+                tag = operator_tags[text]
+                value = intern(text)
+
             # Newline
-            if self.current_char() == '\n':
-                self.tokens.append(Token(TokenType.NEWLINE, '\\n', start_line, start_column))
-                self.advance()
-                continue
-            
-            # Comments
-            if self.current_char() == '/' and self.peek_char() in ['/', '*']:
-                comment = self.read_comment()
-                self.tokens.append(Token(TokenType.COMMENT, comment, start_line, start_column))
-                continue
-            
-            # Strings
-            if self.current_char() in ['"', "'"]:
-                quote_char = self.current_char()
-                string_value = self.read_string(quote_char)
-                self.tokens.append(Token(TokenType.STRING, string_value, start_line, start_column))
-                continue
-            
+            elif kind == 'NL':
+                tag = _NEWLINE_TAG
+                value = '\\n'
+
             # Numbers
-            if self.current_char().isdigit():
-                number = self.read_number()
-                self.tokens.append(Token(TokenType.NUMBER, number, start_line, start_column))
-                continue
-            
-            # Identifiers and keywords
-            if self.current_char().isalpha() or self.current_char() == '_':
-                identifier = self.read_identifier()
-                token_type = KEYWORDS.get(identifier, TokenType.IDENTIFIER)
-                self.tokens.append(Token(token_type, identifier, start_line, start_column))
-                continue
-            
-            # Two-character operators
-            two_char = self.current_char() + (self.peek_char() or '')
-            if two_char in TWO_CHAR_OPERATORS:
-                self.tokens.append(Token(TWO_CHAR_OPERATORS[two_char], two_char, start_line, start_column))
-                self.advance()
-                self.advance()
-                continue
-            
-            # One-character operators
-            if self.current_char() in ONE_CHAR_OPERATORS:
-                char = self.current_char()
-                self.tokens.append(Token(ONE_CHAR_OPERATORS[char], char, start_line, start_column))
-                self.advance()
-                continue
-            
+            elif kind == 'NUMBER':
+                tag = _NUMBER_TAG
+                value = text
+
+            # Strings and comments (literal bodies and import paths repeat
+            # as well, so these are interned too)
+            elif kind == 'STRING':
+                tag = _STRING_TAG
+                value = text[1:-1]
+                if '\\' in value:
+                    value = _unescape(value)
+                value = intern(value)
+            elif kind == 'LINE_COMMENT' or kind == 'BLOCK_COMMENT':
+                tag = _COMMENT_TAG
+                value = text
+
+            # Unterminated tokens run until end of file, so report that line
+            elif kind == 'UNCLOSED_STRING':
+                raise LexerError(f"Unclosed string at line {len(self.tokens.line_starts)}")
+            elif kind == 'UNCLOSED_COMMENT':
+                raise LexerError(f"Unclosed block comment at line {len(self.tokens.line_starts)}")
+
             # Unrecognized character
-            raise LexerError(f"Unrecognized character '{self.current_char()}' at line {self.line}, column {self.column}")
-        
+            else:
+                line, column = self.tokens.location(m.start())
+                raise LexerError(f"Unrecognized character '{text}' at line {line}, column {column}")
+
+            add_type(tag)
+            add_value(value)
+            add_position(m.start())
+
         # Add EOF token
-        self.tokens.append(Token(TokenType.EOF, '', self.line, self.column))
+        self.tokens.append(TokenType.EOF, '', len(source))
         return self.tokens
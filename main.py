@@ -7,63 +7,87 @@ Transpiles Go code with classes and exceptions to standard Go
 import sys
 import argparse
 from pathlib import Path
+from typing import Optional
 from lexer import Lexer
 from parser import Parser
 from transpiler import Transpiler
+from build_cache import ASTCache, default_cache_dir, write_atomic
 
-def main():
-    parser = argparse.ArgumentParser(description='Go-Extended to Go Transpiler')
-    parser.add_argument('input', help='Input Go-Extended file')
-    parser.add_argument('-o', '--output', help='Output Go file (default: <input>.go)')
-    parser.add_argument('-v', '--verbose', action='store_true', help='Verbose mode')
+def transpile(input_file: Path, output_file: Optional[Path] = None, verbose: bool = False,
+              use_cache: bool = False) -> Path:
+    """Transpiles a Go-Extended file to Go and returns the output path"""
+    if output_file is None:
+        output_file = input_file.with_suffix('.go')
     
-    args = parser.parse_args()
+    # Read source code
+    with open(input_file, 'r', encoding='utf-8') as f:
+        source_code = f.read()
     
-    input_file = Path(args.input)
-    if not input_file.exists():
-        print(f"Error: File '{input_file}' not found")
-        sys.exit(1)
+    if verbose:
+        print(f"Reading file: {input_file}")
     
-    output_file = Path(args.output) if args.output else input_file.with_suffix('.go')
+    # Unchanged sources skip lexing and parsing
+    cache = ASTCache(default_cache_dir()) if use_cache else None
+    ast = cache.load(source_code) if cache else None
     
-    try:
-        # Read source code
-        with open(input_file, 'r', encoding='utf-8') as f:
-            source_code = f.read()
-        
-        if args.verbose:
-            print(f"Reading file: {input_file}")
-        
+    if ast is not None:
+        if verbose:
+            print("AST loaded from cache")
+    else:
         # Tokenize
         lexer = Lexer(source_code)
         tokens = lexer.tokenize()
         
-        if args.verbose:
+        if verbose:
             print(f"Generated tokens: {len(tokens)}")
         
         # Parse
         parser = Parser(tokens)
         ast = parser.parse()
         
-        if args.verbose:
+        if verbose:
             print("AST generated successfully")
         
-        # Transpile
-        transpiler = Transpiler()
-        go_code = transpiler.transpile(ast)
-        
-        # Write output file
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(go_code)
-        
+        if cache:
+            cache.store(source_code, ast)
+    
+    # Render fully before touching the output, so a failed run keeps the
+    # previous output intact
+    transpiler = Transpiler()
+    go_code = transpiler.transpile(ast)
+    
+    write_atomic(output_file, go_code.encode('utf-8'))
+    return output_file
+
+def transpile_single_file(input_file: Path, output_file: Optional[Path] = None, verbose: bool = False,
+                          use_cache: bool = False) -> None:
+    """Transpiles a file, reporting errors and exiting like the command line tool"""
+    if not input_file.exists():
+        print(f"Error: File '{input_file}' not found")
+        sys.exit(1)
+    
+    try:
+        output_file = transpile(input_file, output_file, verbose, use_cache)
         print(f"Transpilation completed: {input_file} -> {output_file}")
         
     except Exception as e:
         print(f"Error during transpilation: {e}")
-        if args.verbose:
+        if verbose:
             import traceback
             traceback.print_exc()
         sys.exit(1)
 
+def main():
+    parser = argparse.ArgumentParser(description='Go-Extended to Go Transpiler')
+    parser.add_argument('input', help='Input Go-Extended file')
+    parser.add_argument('-o', '--output', help='Output Go file (default: <input>.go)')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Verbose mode')
+    parser.add_argument('--cache', action='store_true', help='Cache the parsed AST in the user cache directory')
+    
+    args = parser.parse_args()
+    
+    output_file = Path(args.output) if args.output else None
+    transpile_single_file(Path(args.input), output_file, args.verbose, args.cache)
+
 if __name__ == '__main__':
     main()
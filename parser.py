@@ -3,127 +3,237 @@ Parser for Go-Extended
 Converts tokens into an AST (Abstract Syntax Tree)
 """
 
-from typing import List, Optional, Union
-from tokens import Token, TokenType
+from collections import deque
+from typing import Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple, Union, cast
+from tokens import Token, TokenArray, TokenType
 from ast_nodes import *
 
+# Token types the parser never looks at
+_SKIP = frozenset((TokenType.COMMENT, TokenType.NEWLINE))
+
+# Operator sets for the hot membership tests
+_ASSIGN_OPS = frozenset((TokenType.ASSIGN, TokenType.SHORT_ASSIGN, TokenType.PLUS_ASSIGN, TokenType.MINUS_ASSIGN,
+                         TokenType.MULT_ASSIGN, TokenType.DIV_ASSIGN, TokenType.MOD_ASSIGN))
+_UNARY_OPS = frozenset((TokenType.NOT, TokenType.MINUS, TokenType.PLUS))
+
+# Tokens that end the statement list of a switch case
+_CASE_END = frozenset((TokenType.CASE, TokenType.DEFAULT, TokenType.RBRACE))
+
+# Binary operator precedence, from loosest to tightest binding
+_BINARY_PRECEDENCE = {
+    TokenType.OR: 1,
+    TokenType.AND: 2,
+    TokenType.EQ: 3, TokenType.NE: 3,
+    TokenType.LT: 4, TokenType.LE: 4, TokenType.GT: 4, TokenType.GE: 4,
+    TokenType.PLUS: 5, TokenType.MINUS: 5,
+    TokenType.MULTIPLY: 6, TokenType.DIVIDE: 6, TokenType.MODULO: 6,
+}
+
+# Token types as module globals for the parse methods: on Python 3.11 an
+# enum class attribute lookup goes through EnumType's __getattr__ hook and
+# costs about 100ns, against a few ns for a global
+_IDENTIFIER = TokenType.IDENTIFIER
+_STRING = TokenType.STRING
+_PACKAGE = TokenType.PACKAGE
+_IMPORT = TokenType.IMPORT
+_FUNC = TokenType.FUNC
+_VAR = TokenType.VAR
+_CONST = TokenType.CONST
+_TYPE = TokenType.TYPE
+_STRUCT = TokenType.STRUCT
+_INTERFACE = TokenType.INTERFACE
+_IF = TokenType.IF
+_ELSE = TokenType.ELSE
+_FOR = TokenType.FOR
+_RANGE = TokenType.RANGE
+_SWITCH = TokenType.SWITCH
+_CASE = TokenType.CASE
+_DEFAULT = TokenType.DEFAULT
+_BREAK = TokenType.BREAK
+_CONTINUE = TokenType.CONTINUE
+_RETURN = TokenType.RETURN
+_GO = TokenType.GO
+_DEFER = TokenType.DEFER
+_CLASS = TokenType.CLASS
+_NEW = TokenType.NEW
+_EXTENDS = TokenType.EXTENDS
+_TRY = TokenType.TRY
+_CATCH = TokenType.CATCH
+_FINALLY = TokenType.FINALLY
+_THROW = TokenType.THROW
+_ASSIGN = TokenType.ASSIGN
+_SHORT_ASSIGN = TokenType.SHORT_ASSIGN
+_LPAREN = TokenType.LPAREN
+_RPAREN = TokenType.RPAREN
+_LBRACE = TokenType.LBRACE
+_RBRACE = TokenType.RBRACE
+_LBRACKET = TokenType.LBRACKET
+_RBRACKET = TokenType.RBRACKET
+_SEMICOLON = TokenType.SEMICOLON
+_COMMA = TokenType.COMMA
+_DOT = TokenType.DOT
+_COLON = TokenType.COLON
+_EOF = TokenType.EOF
+
 class ParseError(Exception):
     """Parser error"""
     pass
 
+def _until_eof(tokens: Iterable[Token]) -> Iterator[Token]:
+    """Yields the tokens to parse up to the first EOF, adding one if missing"""
+    last = None
+    for token in tokens:
+        if token.type in _SKIP:
+            continue
+        yield token
+        if token.type is TokenType.EOF:
+            return
+        last = token
+    yield Token(TokenType.EOF, '', last.line if last else 1, last.column if last else 1)
+
 class Parser:
-    def __init__(self, tokens: List[Token]):
-        self.tokens = [t for t in tokens if t.type not in [TokenType.COMMENT, TokenType.NEWLINE]]
-        self.pos = 0
-        self.current_token = self.tokens[0] if self.tokens else None
+    def __init__(self, tokens: Iterable[Token]):
+        # Tokens are streamed: each is built when the parser reaches it,
+        # and only peeked tokens are buffered
+        if isinstance(tokens, TokenArray):
+            # Filter on the packed tags, so skipped tokens are never built
+            # (lexer output always ends with EOF)
+            self._tokens = tokens.iter_without(_SKIP)
+        else:
+            self._tokens = _until_eof(tokens)
+        self._lookahead: Deque[Token] = deque()
+        
+        # The stream ends with an EOF sentinel, so nothing is consumed
+        # past it as no rule matches it
+        self.current_token: Token = next(self._tokens)
+        
+        # Parse methods keyed by the token that starts the construct
+        self._decl_dispatch: Dict[TokenType, Callable[[], Declaration]] = {
+            TokenType.FUNC: self.parse_func_decl,
+            TokenType.VAR: self.parse_var_decl,
+            TokenType.CONST: self.parse_const_decl,
+            TokenType.TYPE: self.parse_type_decl,
+            TokenType.STRUCT: self.parse_struct_decl,
+            TokenType.INTERFACE: self.parse_interface_decl,
+            TokenType.CLASS: self.parse_class_decl,
+        }
+        self._stmt_dispatch: Dict[TokenType, Callable[[], Statement]] = {
+            TokenType.VAR: self.parse_var_decl,
+            TokenType.IF: self.parse_if_stmt,
+            TokenType.FOR: self.parse_for_stmt,
+            TokenType.SWITCH: self.parse_switch_stmt,
+            TokenType.RETURN: self.parse_return_stmt,
+            TokenType.BREAK: self.parse_break_stmt,
+            TokenType.CONTINUE: self.parse_continue_stmt,
+            TokenType.GO: self.parse_go_stmt,
+            TokenType.DEFER: self.parse_defer_stmt,
+            TokenType.TRY: self.parse_try_stmt,
+            TokenType.THROW: self.parse_throw_stmt,
+            TokenType.LBRACE: self.parse_block_stmt,
+        }
+        self._primary_dispatch: Dict[TokenType, Callable[[], Expression]] = {
+            TokenType.NUMBER: self.parse_number,
+            TokenType.STRING: self.parse_string,
+            TokenType.BOOLEAN: self.parse_boolean,
+            TokenType.NEW: self.parse_new_expr,
+            TokenType.THIS: self.parse_this,
+            TokenType.SUPER: self.parse_super,
+            TokenType.LPAREN: self.parse_paren_expr,
+        }
     
     def advance(self) -> None:
-        """Advances to the next token"""
-        if self.pos < len(self.tokens) - 1:
-            self.pos += 1
-            self.current_token = self.tokens[self.pos]
-        else:
-            self.current_token = None
+        """Advances to the next token (staying on EOF at the end)"""
+        lookahead = self._lookahead
+        self.current_token = lookahead.popleft() if lookahead else next(self._tokens, self.current_token)
     
     def peek(self, offset: int = 1) -> Optional[Token]:
         """Peeks at the next token without advancing"""
-        peek_pos = self.pos + offset
-        if peek_pos < len(self.tokens):
-            return self.tokens[peek_pos]
-        return None
+        lookahead = self._lookahead
+        while len(lookahead) < offset:
+            token = next(self._tokens, None)
+            if token is None:
+                return None
+            lookahead.append(token)
+        return lookahead[offset - 1]
     
     def match(self, *token_types: TokenType) -> bool:
         """Checks if the current token is one of the specified types"""
-        if not self.current_token:
-            return False
         return self.current_token.type in token_types
     
-    def consume(self, token_type: TokenType, message: str = None) -> Token:
+    def consume(self, token_type: TokenType, message: Optional[str] = None) -> Token:
         """Consumes a token of the specified type or raises an error"""
-        if not self.current_token or self.current_token.type != token_type:
-            msg = message or f"Expected {token_type.name}, found {self.current_token.type.name if self.current_token else 'EOF'}"
-            raise ParseError(msg)
-        
         token = self.current_token
+        if token.type is not token_type:
+            raise ParseError(message or f"Expected {token_type.name}, found {token.type.name}")
+        
         self.advance()
         return token
     
     def parse(self) -> Program:
         """Main parse method - returns the program"""
         # package declaration
-        self.consume(TokenType.PACKAGE, "Expected 'package'")
-        package_name = self.consume(TokenType.IDENTIFIER, "Expected package name").value
+        self.consume(_PACKAGE, "Expected 'package'")
+        package_name = self.consume(_IDENTIFIER, "Expected package name").value
         
         # imports
         imports = []
-        while self.match(TokenType.IMPORT):
+        while self.match(_IMPORT):
             imports.append(self.parse_import())
         
         # declarations
         declarations = []
-        while self.current_token and not self.match(TokenType.EOF):
+        while self.current_token.type is not _EOF:
             declarations.append(self.parse_declaration())
         
-        return Program(package_name, imports, declarations)
+        return Program(package_name, tuple(imports), tuple(declarations))
     
     def parse_import(self) -> ImportDecl:
         """Parses an import declaration"""
-        self.consume(TokenType.IMPORT)
+        self.consume(_IMPORT)
         
         alias = None
-        if self.match(TokenType.IDENTIFIER) and self.peek() and self.peek().type == TokenType.STRING:
-            alias = self.current_token.value
+        token = self.current_token
+        if token.type is _IDENTIFIER and self._peek_type(1) is _STRING:
+            alias = token.value
             self.advance()
         
-        path = self.consume(TokenType.STRING, "Expected import path").value
+        path = self.consume(_STRING, "Expected import path").value
         return ImportDecl(path, alias)
     
     def parse_declaration(self) -> Declaration:
         """Parses a declaration"""
-        if self.match(TokenType.FUNC):
-            return self.parse_func_decl()
-        elif self.match(TokenType.VAR):
-            return self.parse_var_decl()
-        elif self.match(TokenType.CONST):
-            return self.parse_const_decl()
-        elif self.match(TokenType.TYPE):
-            return self.parse_type_decl()
-        elif self.match(TokenType.STRUCT):
-            return self.parse_struct_decl()
-        elif self.match(TokenType.INTERFACE):
-            return self.parse_interface_decl()
-        elif self.match(TokenType.CLASS):
-            return self.parse_class_decl()
-        else:
-            raise ParseError(f"Unrecognized declaration: {self.current_token.value if self.current_token else 'EOF'}")
+        parse = self._decl_dispatch.get(self.current_token.type)
+        if parse is None:
+            raise ParseError(f"Unrecognized declaration: {self.current_token.value}")
+        return parse()
     
-    def parse_func_decl(self) -> FuncDecl:
-        """Parses a function declaration"""
-        self.consume(TokenType.FUNC)
-        name = self.consume(TokenType.IDENTIFIER, "Expected function name").value
+    def parse_func_decl(self, receiver: Optional[str] = None) -> FuncDecl:
+        """Parses a function declaration, or a method of the receiver class"""
+        self.consume(_FUNC)
+        name = self.consume(_IDENTIFIER, "Expected function name").value
         
-        self.consume(TokenType.LPAREN)
+        self.consume(_LPAREN)
         params = self.parse_parameter_list()
-        self.consume(TokenType.RPAREN)
+        self.consume(_RPAREN)
         
         return_type = None
-        if not self.match(TokenType.LBRACE):
-            return_type = self.consume(TokenType.IDENTIFIER, "Expected return type").value
+        if not self.match(_LBRACE):
+            return_type = self.consume(_IDENTIFIER, "Expected return type").value
         
         body = self.parse_block_stmt()
-        return FuncDecl(name, params, return_type, body)
+        return FuncDecl(name, params, return_type, body, receiver)
     
     def parse_var_decl(self) -> VarDecl:
         """Parses a variable declaration"""
-        self.consume(TokenType.VAR)
-        name = self.consume(TokenType.IDENTIFIER, "Expected variable name").value
+        self.consume(_VAR)
+        name = self.consume(_IDENTIFIER, "Expected variable name").value
         
         type_name = None
-        if not self.match(TokenType.ASSIGN):
-            type_name = self.consume(TokenType.IDENTIFIER, "Expected variable type").value
+        if not self.match(_ASSIGN):
+            type_name = self.consume(_IDENTIFIER, "Expected variable type").value
         
         value = None
-        if self.match(TokenType.ASSIGN):
+        if self.match(_ASSIGN):
             self.advance()
             value = self.parse_expression()
         
@@ -131,224 +241,184 @@ class Parser:
     
     def parse_const_decl(self) -> ConstDecl:
         """Parses a constant declaration"""
-        self.consume(TokenType.CONST)
-        name = self.consume(TokenType.IDENTIFIER, "Expected constant name").value
+        self.consume(_CONST)
+        name = self.consume(_IDENTIFIER, "Expected constant name").value
         
         type_name = None
-        if not self.match(TokenType.ASSIGN):
-            type_name = self.consume(TokenType.IDENTIFIER, "Expected constant type").value
+        if not self.match(_ASSIGN):
+            type_name = self.consume(_IDENTIFIER, "Expected constant type").value
         
-        self.consume(TokenType.ASSIGN)
+        self.consume(_ASSIGN)
         value = self.parse_expression()
         
         return ConstDecl(name, type_name, value)
     
     def parse_type_decl(self) -> TypeDecl:
         """Parses a type declaration"""
-        self.consume(TokenType.TYPE)
-        name = self.consume(TokenType.IDENTIFIER, "Expected type name").value
-        type_def = self.consume(TokenType.IDENTIFIER, "Expected type definition").value
+        self.consume(_TYPE)
+        name = self.consume(_IDENTIFIER, "Expected type name").value
+        type_def = self.consume(_IDENTIFIER, "Expected type definition").value
         
         return TypeDecl(name, type_def)
     
     def parse_struct_decl(self) -> StructDecl:
         """Parses a struct declaration"""
-        self.consume(TokenType.STRUCT)
-        name = self.consume(TokenType.IDENTIFIER, "Expected struct name").value
+        self.consume(_STRUCT)
+        name = self.consume(_IDENTIFIER, "Expected struct name").value
         
-        self.consume(TokenType.LBRACE)
+        self.consume(_LBRACE)
         fields = []
         
-        while not self.match(TokenType.RBRACE) and self.current_token:
-            field_name = self.consume(TokenType.IDENTIFIER, "Expected field name").value
-            field_type = self.consume(TokenType.IDENTIFIER, "Expected field type").value
+        while self.current_token.type is not _RBRACE:
+            field_name = self.consume(_IDENTIFIER, "Expected field name").value
+            field_type = self.consume(_IDENTIFIER, "Expected field type").value
             fields.append(StructField(field_name, field_type))
         
-        self.consume(TokenType.RBRACE)
-        return StructDecl(name, fields)
+        self.consume(_RBRACE)
+        return StructDecl(name, tuple(fields))
     
     def parse_interface_decl(self) -> InterfaceDecl:
         """Parses an interface declaration"""
-        self.consume(TokenType.INTERFACE)
-        name = self.consume(TokenType.IDENTIFIER, "Expected interface name").value
+        self.consume(_INTERFACE)
+        name = self.consume(_IDENTIFIER, "Expected interface name").value
         
-        self.consume(TokenType.LBRACE)
+        self.consume(_LBRACE)
         methods = []
         
-        while not self.match(TokenType.RBRACE) and self.current_token:
-            method_name = self.consume(TokenType.IDENTIFIER, "Expected method name").value
+        while self.current_token.type is not _RBRACE:
+            method_name = self.consume(_IDENTIFIER, "Expected method name").value
             
-            self.consume(TokenType.LPAREN)
+            self.consume(_LPAREN)
             params = self.parse_parameter_list()
-            self.consume(TokenType.RPAREN)
+            self.consume(_RPAREN)
             
             return_type = None
-            if not self.match(TokenType.RBRACE) and self.match(TokenType.IDENTIFIER):
-                return_type = self.current_token.value
+            token = self.current_token
+            if token.type is _IDENTIFIER:
+                return_type = token.value
                 self.advance()
             
             methods.append(MethodSignature(method_name, params, return_type))
         
-        self.consume(TokenType.RBRACE)
-        return InterfaceDecl(name, methods)
+        self.consume(_RBRACE)
+        return InterfaceDecl(name, tuple(methods))
     
     def parse_class_decl(self) -> ClassDecl:
         """Parses a class declaration (extension)"""
-        self.consume(TokenType.CLASS)
-        name = self.consume(TokenType.IDENTIFIER, "Expected class name").value
+        self.consume(_CLASS)
+        name = self.consume(_IDENTIFIER, "Expected class name").value
         
         extends = None
-        if self.match(TokenType.EXTENDS):
+        if self.match(_EXTENDS):
             self.advance()
-            extends = self.consume(TokenType.IDENTIFIER, "Expected parent class name").value
+            extends = self.consume(_IDENTIFIER, "Expected parent class name").value
         
-        self.consume(TokenType.LBRACE)
+        self.consume(_LBRACE)
         
         fields = []
         methods = []
         constructor = None
         
-        while not self.match(TokenType.RBRACE) and self.current_token:
-            if self.match(TokenType.IDENTIFIER) and self.current_token.value == name:
+        while True:
+            token = self.current_token
+            if token.type is _RBRACE:
+                break
+            elif token.type is _IDENTIFIER and token.value == name:
                 # Constructor
                 constructor = self.parse_constructor()
-            elif self.match(TokenType.FUNC):
+            elif token.type is _FUNC:
                 # Method
-                methods.append(self.parse_method_decl())
+                methods.append(self.parse_func_decl(name))
             else:
                 # Field
-                field_name = self.consume(TokenType.IDENTIFIER, "Expected field name").value
-                field_type = self.consume(TokenType.IDENTIFIER, "Expected field type").value
+                field_name = self.consume(_IDENTIFIER, "Expected field name").value
+                field_type = self.consume(_IDENTIFIER, "Expected field type").value
                 
                 field_value = None
-                if self.match(TokenType.ASSIGN):
+                if self.match(_ASSIGN):
                     self.advance()
                     field_value = self.parse_expression()
                 
                 fields.append(ClassField(field_name, field_type, field_value))
         
-        self.consume(TokenType.RBRACE)
-        return ClassDecl(name, extends, fields, methods, constructor)
+        self.consume(_RBRACE)
+        return ClassDecl(name, extends, tuple(fields), tuple(methods), constructor)
     
     def parse_constructor(self) -> ConstructorDecl:
         """Parses a constructor"""
         self.advance()  # class name
         
-        self.consume(TokenType.LPAREN)
+        self.consume(_LPAREN)
         params = self.parse_parameter_list()
-        self.consume(TokenType.RPAREN)
+        self.consume(_RPAREN)
         
         body = self.parse_block_stmt()
         return ConstructorDecl(params, body)
     
-    def parse_method_decl(self) -> MethodDecl:
-        """Parses a method declaration"""
-        self.consume(TokenType.FUNC)
-        name = self.consume(TokenType.IDENTIFIER, "Expected method name").value
-        
-        self.consume(TokenType.LPAREN)
-        params = self.parse_parameter_list()
-        self.consume(TokenType.RPAREN)
-        
-        return_type = None
-        if not self.match(TokenType.LBRACE):
-            return_type = self.consume(TokenType.IDENTIFIER, "Expected return type").value
-        
-        body = self.parse_block_stmt()
-        return MethodDecl(name, params, return_type, body)
-    
-    def parse_parameter_list(self) -> List[Parameter]:
+    def parse_parameter_list(self) -> Tuple[Parameter, ...]:
         """Parses a parameter list"""
         params = []
         
-        while not self.match(TokenType.RPAREN) and self.current_token:
-            param_name = self.consume(TokenType.IDENTIFIER, "Expected parameter name").value
-            param_type = self.consume(TokenType.IDENTIFIER, "Expected parameter type").value
-            params.append(Parameter(param_name, param_type))
+        # One type check per element; a trailing comma is allowed
+        while self.current_token.type is not _RPAREN:
+            param_name = self.consume(_IDENTIFIER, "Expected parameter name").value
+            param_type = self.consume(_IDENTIFIER, "Expected parameter type").value
+            params.append(mk_parameter(param_name, param_type))
             
-            if self.match(TokenType.COMMA):
-                self.advance()
-            else:
+            if self.current_token.type is not _COMMA:
                 break
+            self.advance()
         
-        return params
+        return tuple(params)
     
     def parse_block_stmt(self) -> BlockStmt:
         """Parses a block of statements"""
-        self.consume(TokenType.LBRACE)
+        self.consume(_LBRACE)
         statements = []
         
-        while not self.match(TokenType.RBRACE) and self.current_token:
+        while self.current_token.type is not _RBRACE:
             statements.append(self.parse_statement())
         
-        self.consume(TokenType.RBRACE)
-        return BlockStmt(statements)
+        self.consume(_RBRACE)
+        return BlockStmt(tuple(statements))
     
     def parse_statement(self) -> Statement:
         """Parses a statement"""
-        if self.match(TokenType.VAR):
-            return self.parse_var_stmt()
-        elif self.match(TokenType.IF):
-            return self.parse_if_stmt()
-        elif self.match(TokenType.FOR):
-            return self.parse_for_stmt()
-        elif self.match(TokenType.SWITCH):
-            return self.parse_switch_stmt()
-        elif self.match(TokenType.RETURN):
-            return self.parse_return_stmt()
-        elif self.match(TokenType.BREAK):
-            self.advance()
-            return BreakStmt()
-        elif self.match(TokenType.CONTINUE):
-            self.advance()
-            return ContinueStmt()
-        elif self.match(TokenType.GO):
-            return self.parse_go_stmt()
-        elif self.match(TokenType.DEFER):
-            return self.parse_defer_stmt()
-        elif self.match(TokenType.TRY):
-            return self.parse_try_stmt()
-        elif self.match(TokenType.THROW):
-            return self.parse_throw_stmt()
-        elif self.match(TokenType.LBRACE):
-            return self.parse_block_stmt()
-        else:
-            # Expression statement or assignment
-            expr = self.parse_expression()
-            
-            if self.match(TokenType.ASSIGN, TokenType.SHORT_ASSIGN, TokenType.PLUS_ASSIGN, TokenType.MINUS_ASSIGN,
-                         TokenType.MULT_ASSIGN, TokenType.DIV_ASSIGN, TokenType.MOD_ASSIGN):
-                op = self.current_token.value
-                self.advance()
-                value = self.parse_expression()
-                return AssignStmt(expr, value, op)
-            else:
-                return ExpressionStmt(expr)
+        parse = self._stmt_dispatch.get(self.current_token.type)
+        if parse is None:
+            return self.parse_simple_stmt()
+        return parse()
     
-    def parse_var_stmt(self) -> VarStmt:
-        """Parses a variable statement"""
-        self.consume(TokenType.VAR)
-        name = self.consume(TokenType.IDENTIFIER, "Expected variable name").value
+    def parse_simple_stmt(self) -> Statement:
+        """Parses an expression statement or assignment"""
+        expr = self.parse_expression()
         
-        type_name = None
-        if not self.match(TokenType.ASSIGN):
-            type_name = self.consume(TokenType.IDENTIFIER, "Expected variable type").value
-        
-        value = None
-        if self.match(TokenType.ASSIGN):
+        if self.current_token.type in _ASSIGN_OPS:
+            op = self.current_token.value
             self.advance()
             value = self.parse_expression()
-        
-        return VarStmt(name, type_name, value)
+            return AssignStmt(expr, value, op)
+        else:
+            return ExpressionStmt(expr)
+    
+    def parse_break_stmt(self) -> BreakStmt:
+        """Parses a break statement"""
+        self.consume(_BREAK)
+        return BREAK_STMT
+    
+    def parse_continue_stmt(self) -> ContinueStmt:
+        """Parses a continue statement"""
+        self.consume(_CONTINUE)
+        return CONTINUE_STMT
     
     def parse_if_stmt(self) -> IfStmt:
         """Parses an if statement"""
-        self.consume(TokenType.IF)
+        self.consume(_IF)
         condition = self.parse_expression()
         then_stmt = self.parse_statement()
         
         else_stmt = None
-        if self.match(TokenType.ELSE):
+        if self.match(_ELSE):
             self.advance()
             else_stmt = self.parse_statement()
         
@@ -356,297 +426,264 @@ class Parser:
     
     def parse_for_stmt(self) -> Union[ForStmt, RangeStmt]:
         """Parses a for statement"""
-        self.consume(TokenType.FOR)
+        self.consume(_FOR)
         
-        # Check if it's a for range
-        if self.match(TokenType.IDENTIFIER):
-            # Could be for range or normal for
-            checkpoint = self.pos
+        # For range: key [, value] := range iterable
+        if self._at_range_clause():
+            key = self.current_token.value
+            self.advance()
             
-            try:
-                # Try to parse as range
-                key = self.current_token.value
+            value = None
+            if self.match(_COMMA):
                 self.advance()
-                
-                value = None
-                if self.match(TokenType.COMMA):
-                    self.advance()
-                    value = self.consume(TokenType.IDENTIFIER).value
-                
-                self.consume(TokenType.COLON)
-                self.consume(TokenType.ASSIGN)
-                self.consume(TokenType.RANGE)
-                
-                iterable = self.parse_expression()
-                body = self.parse_statement()
-                
-                return RangeStmt(key, value, iterable, body)
+                value = self.consume(_IDENTIFIER).value
+            
+            # ':=' is one token, but ': =' is accepted as well
+            if self.match(_SHORT_ASSIGN):
+                self.advance()
+            else:
+                self.consume(_COLON)
+                self.consume(_ASSIGN)
+            self.consume(_RANGE)
             
-            except ParseError:
-                # Go back to checkpoint and try normal for
-                self.pos = checkpoint
-                self.current_token = self.tokens[self.pos]
+            iterable = self.parse_expression()
+            body = self.parse_statement()
+            
+            return RangeStmt(key, value, iterable, body)
         
         # Normal for
         init = None
-        if not self.match(TokenType.SEMICOLON):
+        if not self.match(_SEMICOLON):
             init = self.parse_statement()
-        self.consume(TokenType.SEMICOLON)
+        self.consume(_SEMICOLON)
         
         condition = None
-        if not self.match(TokenType.SEMICOLON):
+        if not self.match(_SEMICOLON):
             condition = self.parse_expression()
-        self.consume(TokenType.SEMICOLON)
+        self.consume(_SEMICOLON)
         
         update = None
-        if not self.match(TokenType.LBRACE):
+        if not self.match(_LBRACE):
             update = self.parse_statement()
         
         body = self.parse_statement()
         return ForStmt(init, condition, update, body)
     
+    def _at_range_clause(self) -> bool:
+        """Checks, by bounded lookahead, if a range clause starts here"""
+        if not self.match(_IDENTIFIER):
+            return False
+        
+        offset = 1
+        if self._peek_type(offset) == _COMMA and self._peek_type(offset + 1) == _IDENTIFIER:
+            offset += 2
+        
+        if self._peek_type(offset) == _SHORT_ASSIGN:
+            return self._peek_type(offset + 1) == _RANGE
+        return (self._peek_type(offset) == _COLON and self._peek_type(offset + 1) == _ASSIGN
+                and self._peek_type(offset + 2) == _RANGE)
+    
+    def _peek_type(self, offset: int) -> Optional[TokenType]:
+        """Returns the type of the token at offset, or None past the end"""
+        token = self.peek(offset)
+        return token.type if token else None
+    
     def parse_switch_stmt(self) -> SwitchStmt:
         """Parses a switch statement"""
-        self.consume(TokenType.SWITCH)
+        self.consume(_SWITCH)
         
         expression = None
-        if not self.match(TokenType.LBRACE):
+        if not self.match(_LBRACE):
             expression = self.parse_expression()
         
-        self.consume(TokenType.LBRACE)
+        self.consume(_LBRACE)
         
         cases = []
         default_case = None
         
-        while not self.match(TokenType.RBRACE) and self.current_token:
-            if self.match(TokenType.CASE):
+        while True:
+            token_type = self.current_token.type
+            if token_type is _RBRACE:
+                break
+            
+            elif token_type is _CASE:
                 self.advance()
                 values = [self.parse_expression()]
                 
-                while self.match(TokenType.COMMA):
+                while self.current_token.type is _COMMA:
                     self.advance()
                     values.append(self.parse_expression())
                 
-                self.consume(TokenType.COLON)
+                self.consume(_COLON)
                 
                 body = []
-                while not self.match(TokenType.CASE, TokenType.DEFAULT, TokenType.RBRACE) and self.current_token:
+                while self.current_token.type not in _CASE_END:
                     body.append(self.parse_statement())
                 
-                cases.append(CaseStmt(values, body))
+                cases.append(CaseStmt(tuple(values), tuple(body)))
             
-            elif self.match(TokenType.DEFAULT):
+            elif token_type is _DEFAULT:
                 self.advance()
-                self.consume(TokenType.COLON)
+                self.consume(_COLON)
                 
                 body = []
-                while not self.match(TokenType.CASE, TokenType.DEFAULT, TokenType.RBRACE) and self.current_token:
+                while self.current_token.type not in _CASE_END:
                     body.append(self.parse_statement())
                 
-                default_case = DefaultStmt(body)
+                default_case = DefaultStmt(tuple(body))
         
-        self.consume(TokenType.RBRACE)
-        return SwitchStmt(expression, cases, default_case)
+        self.consume(_RBRACE)
+        return SwitchStmt(expression, tuple(cases), default_case)
     
     def parse_return_stmt(self) -> ReturnStmt:
         """Parses a return statement"""
-        self.consume(TokenType.RETURN)
+        self.consume(_RETURN)
         
         value = None
-        if not self.match(TokenType.RBRACE, TokenType.SEMICOLON) and self.current_token:
+        if not self.match(_RBRACE, _SEMICOLON):
             value = self.parse_expression()
         
         return ReturnStmt(value)
     
     def parse_go_stmt(self) -> GoStmt:
         """Parses a go statement"""
-        self.consume(TokenType.GO)
+        self.consume(_GO)
         call = self.parse_expression()
         
-        if not isinstance(call, CallExpr):
+        if call.KIND is not NodeKind.CALL_EXPR:
             raise ParseError("Go statement must be followed by a function call")
         
-        return GoStmt(call)
+        return GoStmt(cast(CallExpr, call))
     
     def parse_defer_stmt(self) -> DeferStmt:
         """Parses a defer statement"""
-        self.consume(TokenType.DEFER)
+        self.consume(_DEFER)
         call = self.parse_expression()
         
-        if not isinstance(call, CallExpr):
+        if call.KIND is not NodeKind.CALL_EXPR:
             raise ParseError("Defer statement must be followed by a function call")
         
-        return DeferStmt(call)
+        return DeferStmt(cast(CallExpr, call))
     
     def parse_try_stmt(self) -> TryStmt:
         """Parses a try statement (extension)"""
-        self.consume(TokenType.TRY)
+        self.consume(_TRY)
         body = self.parse_block_stmt()
         
         catch_blocks = []
-        while self.match(TokenType.CATCH):
+        while self.match(_CATCH):
             catch_blocks.append(self.parse_catch_stmt())
         
         finally_block = None
-        if self.match(TokenType.FINALLY):
+        if self.match(_FINALLY):
             finally_block = self.parse_finally_stmt()
         
-        return TryStmt(body, catch_blocks, finally_block)
+        return TryStmt(body, tuple(catch_blocks), finally_block)
     
     def parse_catch_stmt(self) -> CatchStmt:
         """Parses a catch statement (extension)"""
-        self.consume(TokenType.CATCH)
+        self.consume(_CATCH)
         
         exception_type = None
         exception_var = None
         
-        if self.match(TokenType.LPAREN):
+        if self.match(_LPAREN):
             self.advance()
             
-            if self.match(TokenType.IDENTIFIER):
+            if self.match(_IDENTIFIER):
                 exception_var = self.current_token.value
                 self.advance()
                 
-                if self.match(TokenType.IDENTIFIER):
+                if self.match(_IDENTIFIER):
                     exception_type = exception_var
                     exception_var = self.current_token.value
                     self.advance()
             
-            self.consume(TokenType.RPAREN)
+            self.consume(_RPAREN)
         
         body = self.parse_block_stmt()
         return CatchStmt(exception_type, exception_var, body)
     
     def parse_finally_stmt(self) -> FinallyStmt:
         """Parses a finally statement (extension)"""
-        self.consume(TokenType.FINALLY)
+        self.consume(_FINALLY)
         body = self.parse_block_stmt()
         return FinallyStmt(body)
     
     def parse_throw_stmt(self) -> ThrowStmt:
         """Parses a throw statement (extension)"""
-        self.consume(TokenType.THROW)
+        self.consume(_THROW)
         expression = self.parse_expression()
         return ThrowStmt(expression)
     
     def parse_expression(self) -> Expression:
         """Parses an expression (lowest precedence)"""
-        return self.parse_logical_or()
-    
-    def parse_logical_or(self) -> Expression:
-        """Parses logical OR"""
-        expr = self.parse_logical_and()
-        
-        while self.match(TokenType.OR):
-            op = self.current_token.value
-            self.advance()
-            right = self.parse_logical_and()
-            expr = BinaryExpr(expr, op, right)
-        
-        return expr
-    
-    def parse_logical_and(self) -> Expression:
-        """Parses logical AND"""
-        expr = self.parse_equality()
-        
-        while self.match(TokenType.AND):
-            op = self.current_token.value
-            self.advance()
-            right = self.parse_equality()
-            expr = BinaryExpr(expr, op, right)
-        
-        return expr
+        return self.parse_binary(1)
     
-    def parse_equality(self) -> Expression:
-        """Parses equality"""
-        expr = self.parse_comparison()
-        
-        while self.match(TokenType.EQ, TokenType.NE):
-            op = self.current_token.value
-            self.advance()
-            right = self.parse_comparison()
-            expr = BinaryExpr(expr, op, right)
-        
-        return expr
-    
-    def parse_comparison(self) -> Expression:
-        """Parses comparison"""
-        expr = self.parse_addition()
-        
-        while self.match(TokenType.LT, TokenType.LE, TokenType.GT, TokenType.GE):
-            op = self.current_token.value
-            self.advance()
-            right = self.parse_addition()
-            expr = BinaryExpr(expr, op, right)
-        
-        return expr
-    
-    def parse_addition(self) -> Expression:
-        """Parses addition/subtraction"""
-        expr = self.parse_multiplication()
-        
-        while self.match(TokenType.PLUS, TokenType.MINUS):
-            op = self.current_token.value
-            self.advance()
-            right = self.parse_multiplication()
-            expr = BinaryExpr(expr, op, right)
-        
-        return expr
-    
-    def parse_multiplication(self) -> Expression:
-        """Parses multiplication/division/modulo"""
+    def parse_binary(self, min_precedence: int) -> Expression:
+        """Parses binary operators binding at least as tightly as min_precedence"""
         expr = self.parse_unary()
         
-        while self.match(TokenType.MULTIPLY, TokenType.DIVIDE, TokenType.MODULO):
-            op = self.current_token.value
+        # Operators are left associative: the right operand only takes
+        # operators that bind more tightly
+        token = self.current_token
+        precedence = _BINARY_PRECEDENCE.get(token.type, 0)
+        while precedence >= min_precedence:
             self.advance()
-            right = self.parse_unary()
-            expr = BinaryExpr(expr, op, right)
+            right = self.parse_binary(precedence + 1)
+            expr = BinaryExpr(expr, token.value, right)
+            token = self.current_token
+            precedence = _BINARY_PRECEDENCE.get(token.type, 0)
         
         return expr
     
     def parse_unary(self) -> Expression:
         """Parses unary expression"""
-        if self.match(TokenType.NOT, TokenType.MINUS, TokenType.PLUS):
-            op = self.current_token.value
+        token = self.current_token
+        if token.type in _UNARY_OPS:
             self.advance()
             expr = self.parse_unary()
-            return UnaryExpr(op, expr)
+            return UnaryExpr(token.value, expr)
         
         return self.parse_postfix()
     
+    def parse_argument_list(self) -> Tuple[Expression, ...]:
+        """Parses call arguments up to and including the closing parenthesis"""
+        args = []
+        
+        # One type check per element; a trailing comma is allowed
+        while self.current_token.type is not _RPAREN:
+            args.append(self.parse_expression())
+            
+            if self.current_token.type is not _COMMA:
+                break
+            self.advance()
+        
+        self.consume(_RPAREN)
+        return tuple(args)
+    
     def parse_postfix(self) -> Expression:
         """Parses postfix expression (calls, indexes, selectors)"""
         expr = self.parse_primary()
         
         while True:
-            if self.match(TokenType.LPAREN):
+            token_type = self.current_token.type
+            if token_type is _LPAREN:
                 # Function call
                 self.advance()
-                args = []
-                
-                while not self.match(TokenType.RPAREN) and self.current_token:
-                    args.append(self.parse_expression())
-                    
-                    if self.match(TokenType.COMMA):
-                        self.advance()
-                    else:
-                        break
-                
-                self.consume(TokenType.RPAREN)
-                expr = CallExpr(expr, args)
+                expr = CallExpr(expr, self.parse_argument_list())
             
-            elif self.match(TokenType.LBRACKET):
+            elif token_type is _LBRACKET:
                 # Index access
                 self.advance()
                 index = self.parse_expression()
-                self.consume(TokenType.RBRACKET)
+                self.consume(_RBRACKET)
                 expr = IndexExpr(expr, index)
             
-            elif self.match(TokenType.DOT):
+            elif token_type is _DOT:
                 # Selector
                 self.advance()
-                field = self.consume(TokenType.IDENTIFIER, "Expected field name").value
+                field = self.consume(_IDENTIFIER, "Expected field name").value
                 expr = SelectorExpr(expr, field)
             
             else:
@@ -656,65 +693,60 @@ class Parser:
     
     def parse_primary(self) -> Expression:
         """Parse primary expression"""
-        if self.match(TokenType.IDENTIFIER):
-            name = self.current_token.value
-            self.advance()
-            return Identifier(name)
-        
-        elif self.match(TokenType.NUMBER):
-            value = self.current_token.value
-            self.advance()
-            
-            if '.' in value:
-                return Literal(float(value), 'float')
-            else:
-                return Literal(int(value), 'int')
-        
-        elif self.match(TokenType.STRING):
-            value = self.current_token.value
-            self.advance()
-            return Literal(value, 'string')
-        
-        elif self.match(TokenType.BOOLEAN):
-            value = self.current_token.value == 'true'
-            self.advance()
-            return Literal(value, 'bool')
-        
-        elif self.match(TokenType.NEW):
-            return self.parse_new_expr()
-        
-        elif self.match(TokenType.THIS):
-            self.advance()
-            return ThisExpr()
-        
-        elif self.match(TokenType.SUPER):
+        token = self.current_token
+        # Identifiers are by far the most common leaf, so they skip the table
+        if token.type is _IDENTIFIER:
             self.advance()
-            return SuperExpr()
+            return mk_identifier(token.value)
         
-        elif self.match(TokenType.LPAREN):
-            self.advance()
-            expr = self.parse_expression()
-            self.consume(TokenType.RPAREN)
-            return expr
+        parse = self._primary_dispatch.get(token.type)
+        if parse is None:
+            raise ParseError(f"Unrecognized expression: {token.value}")
+        return parse()
+    
+    def parse_number(self) -> Literal:
+        """Parses a number literal"""
+        value = self.current_token.value
+        self.advance()
         
+        if '.' in value:
+            return mk_literal(float(value), 'float')
         else:
-            raise ParseError(f"Unrecognized expression: {self.current_token.value if self.current_token else 'EOF'}")
+            return mk_literal(int(value), 'int')
+    
+    def parse_string(self) -> Literal:
+        """Parses a string literal"""
+        value = self.current_token.value
+        self.advance()
+        return mk_literal(value, 'string')
+    
+    def parse_boolean(self) -> Literal:
+        """Parses a boolean literal"""
+        is_true = self.current_token.value == 'true'
+        self.advance()
+        return mk_literal(is_true, 'bool')
+    
+    def parse_this(self) -> ThisExpr:
+        """Parses this (extension)"""
+        self.advance()
+        return THIS_EXPR
+    
+    def parse_super(self) -> SuperExpr:
+        """Parses super (extension)"""
+        self.advance()
+        return SUPER_EXPR
+    
+    def parse_paren_expr(self) -> Expression:
+        """Parses a parenthesized expression"""
+        self.advance()
+        expr = self.parse_expression()
+        self.consume(_RPAREN)
+        return expr
     
     def parse_new_expr(self) -> NewExpr:
         """Parse new expression (extension)"""
-        self.consume(TokenType.NEW)
-        class_name = self.consume(TokenType.IDENTIFIER, "Expected class name").value
-        
-        self.consume(TokenType.LPAREN)
-        args = []
-        
-        while not self.match(TokenType.RPAREN) and self.current_token:
-            args.append(self.parse_expression())
-            
-            if self.match(TokenType.COMMA):
-                self.advance()
-            else:
-                break
+        self.consume(_NEW)
+        class_name = self.consume(_IDENTIFIER, "Expected class name").value
         
-        self.consume(TokenType.RPAREN)
-        return NewExpr(class_name, args)
+        self.consume(_LPAREN)
+        return NewExpr(class_name, self.parse_argument_list())
@@ -4,23 +4,189 @@ Supports multiple files and dependency resolution
 """
 
 import os
+import re
+import sys
 import json
+import pickle
+import hashlib
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
-from typing import Dict, List, Set, Optional, Tuple
-from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Set, Optional, Tuple
+from dataclasses import dataclass, replace
 from lexer import Lexer
 from parser import Parser
 from transpiler import Transpiler
-from ast_nodes import Program, ImportDecl, ASTNode, TryStmt, ThrowStmt, CallExpr, Identifier
+from build_cache import ASTCache, OutputCache, source_hash, write_atomic
+from ast_nodes import Program, ImportDecl, TryStmt, ThrowStmt, CallExpr, Identifier, FuncDecl, walk
+
+# Smallest number of files for which a build uses a process pool
+PARALLEL_MIN_FILES = 4
+
+# Go standard library roots; imports under these are never local
+_STDLIB_PACKAGES = frozenset({
+    'fmt', 'os', 'io', 'net', 'http', 'json', 'time', 'strings',
+    'strconv', 'math', 'sort', 'sync', 'context', 'errors',
+    'bufio', 'bytes', 'crypto', 'encoding', 'flag', 'log',
+    'path', 'regexp', 'runtime', 'testing', 'unicode'
+})
+
+# Package clause and imports at the top of a source file (comments and
+# whitespace allowed between tokens), matched without lexing the rest
+_GAP = r'(?:\s|//[^\n]*|/\*.*?\*/)*'
+_HEADER_STRING = r'(?:"(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\')'
+_HEADER_RE = re.compile(rf'{_GAP}package\b{_GAP}[^\W\d]\w*(?:{_GAP}import\b{_GAP}(?:[^\W\d]\w*{_GAP})?{_HEADER_STRING})*', re.DOTALL)
+
+# Blank line ending inline exception definitions: followed by a type, func or blank line
+_EXCEPTIONS_END_RE = re.compile(r'\n[^\S\n]*\n(?=type |func |[^\S\n]*(?:\n|\Z))')
+# Closing line of an import block
+_IMPORT_END_RE = re.compile(r'^[^\S\n]*\)[^\S\n]*$', re.MULTILINE)
+
+def _next_rewrite(go_code: str, pos: int) -> Tuple[int, int, bool]:
+    """Find the next line, from pos on, that starts exception definitions or
+    an import block; returns its start, end and whether it is exceptions"""
+    # str.find is much faster than an anchored regex over generated code
+    marker = go_code.find('// Exception types', pos)
+    import_pos = go_code.find('import (', pos)
+    while import_pos != -1 and (marker == -1 or import_pos < marker):
+        line_start = go_code.rfind('\n', 0, import_pos) + 1
+        line_end = go_code.find('\n', import_pos)
+        if line_end == -1:
+            line_end = len(go_code)
+        if go_code[line_start:line_end].strip() == 'import (':
+            return line_start, line_end, False
+        import_pos = go_code.find('import (', line_end)
+    
+    if marker == -1:
+        return -1, -1, False
+    line_end = go_code.find('\n', marker)
+    return go_code.rfind('\n', 0, marker) + 1, line_end if line_end != -1 else len(go_code), True
+
+# Project-local directory for the AST cache
+CACHE_DIR_NAME = ".goe2go_cache"
+
+# Build manifest in the output directory, recording what each file was
+# generated from
+MANIFEST_NAME = ".goe2go_manifest.json"
+
+def _parse_file(file_path: Path, cache_dir: Optional[Path] = None) -> Tuple[Program, str]:
+    """Lex and parse a source file (runs in a worker process); returns the
+    program and the source hash"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    digest = source_hash(content)
+    
+    # Unchanged sources are loaded from the cache instead of parsed
+    cache = ASTCache(cache_dir) if cache_dir else None
+    program = cache.load(content) if cache else None
+    if program is not None:
+        return program, digest
+    
+    lexer = Lexer(content)
+    tokens = lexer.tokenize()
+    parser = Parser(tokens)
+    program = parser.parse()
+    
+    if cache:
+        cache.store(content, program)
+    return program, digest
+
+def _parse_header(file_path: Path) -> Tuple[Program, str]:
+    """Parse only the package clause and imports of a source file (runs in a
+    worker process); the program has no declarations"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    digest = source_hash(content)
+    
+    # Without a recognizable header, a full parse reports the error
+    header = _HEADER_RE.match(content)
+    if header:
+        content = content[:header.end()]
+    
+    lexer = Lexer(content)
+    tokens = lexer.tokenize()
+    parser = Parser(tokens)
+    return parser.parse(), digest
+
+def _uses_exceptions(node) -> bool:
+    """Check if a file uses exceptions"""
+    for child in walk(node):
+        if isinstance(child, (TryStmt, ThrowStmt)):
+            return True
+        elif isinstance(child, CallExpr) and isinstance(child.function, Identifier):
+            if child.function.name == 'NewException':
+                return True
+    
+    return False
+
+def _output_key(digest: str, settings: str) -> str:
+    """Key the code generated for a source by its hash and the project
+    settings (always in project mode here)"""
+    return hashlib.blake2b(f"{digest}\n{settings}\nproject".encode('utf-8'), digest_size=16).hexdigest()
+
+def _write_if_changed(output_path: Path, content: str) -> bool:
+    """Atomically write content to output_path unless it already holds it;
+    returns whether the file was written"""
+    try:
+        with open(output_path, 'r', encoding='utf-8') as f:
+            if f.read() == content:
+                return False
+    except (OSError, UnicodeDecodeError):
+        pass
+    
+    # Written next to the target and renamed, so a failed build never
+    # leaves a partial file behind
+    write_atomic(output_path, content.encode('utf-8'))
+    return True
+
+class _InlineExecutor:
+    """Runs submitted calls immediately, for builds too small for a pool"""
+    
+    def submit(self, fn, *args) -> Future:
+        future: Future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+    
+    def __enter__(self) -> '_InlineExecutor':
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+def _result(future: Future, fn: Callable, *args) -> Any:
+    """Return the result of fn(*args), submitted as future; runs it inline
+    when its arguments or result could not be pickled to or from a worker"""
+    try:
+        return future.result()
+    except (RecursionError, pickle.PicklingError):
+        # Pickling recurses once per tree level, so very deep programs
+        # (long expression chains) cannot cross process boundaries
+        return fn(*args)
+
+def _executor(jobs: int, max_workers: Optional[int] = None):
+    """Return an executor suited to the number of independent jobs, with at
+    most max_workers processes (by default, one per CPU)"""
+    workers = min(jobs, max_workers or os.cpu_count() or 1)
+    if jobs >= PARALLEL_MIN_FILES and workers > 1:
+        return ProcessPoolExecutor(max_workers=workers)
+    return _InlineExecutor()
 
 @dataclass
 class ProjectFile:
     """Represents a project file"""
     path: Path
     package: str
-    imports: List[str]
+    imports: Tuple[str, ...]  # local (non-stdlib) imports only
     program: Optional[Program] = None
     transpiled: bool = False
+    rel_path: str = ""  # key in ProjectManager.files
+    uses_exceptions: bool = False
+    declares_main: bool = False  # package main with func main
+    source_hash: str = ""
 
 @dataclass 
 class ProjectConfig:
@@ -33,12 +199,16 @@ class ProjectConfig:
     go_mod_name: str = ""
 
 class ProjectManager:
-    def __init__(self, project_root: Path):
+    def __init__(self, project_root: Path, use_cache: bool = True, max_workers: Optional[int] = None):
         self.project_root = project_root
+        self.cache_dir: Optional[Path] = project_root / CACHE_DIR_NAME if use_cache else None
+        self.max_workers = max_workers  # worker processes; None for one per CPU
         self.config: Optional[ProjectConfig] = None
         self.files: Dict[str, ProjectFile] = {}  # path -> ProjectFile
         self.packages: Dict[str, List[ProjectFile]] = {}  # package -> files
         self.dependency_graph: Dict[str, Set[str]] = {}  # file -> dependencies
+        self.main_file: Optional[Path] = None  # generated file with func main
+        self.analysis_errors: List[str] = []  # files that could not be analyzed
         
     def load_config(self) -> ProjectConfig:
         """Load project configuration"""
@@ -67,68 +237,74 @@ class ProjectManager:
         with open(config_file, 'w', encoding='utf-8') as f:
             json.dump(self.config.__dict__, f, indent=2)
     
-    def discover_files(self) -> None:
-        """Discover all .gox files in the project"""
+    def discover_files(self, headers_only: bool = False) -> None:
+        """Discover all .gox files in the project
+        
+        With headers_only, only package clauses and imports are parsed and
+        the files keep no program.
+        """
         source_dir = self.project_root / self.config.source_dir
         
         if not source_dir.exists():
             source_dir = self.project_root
         
-        # Find all .gox files
-        for gox_file in source_dir.rglob("*.gox"):
-            self._analyze_file(gox_file)
+        # Find all .gox files and parse them in parallel
+        gox_files = list(source_dir.rglob("*.gox"))
+        parse = _parse_header if headers_only else partial(_parse_file, cache_dir=self.cache_dir)
+        with _executor(len(gox_files), self.max_workers) as executor:
+            parsed = [executor.submit(parse, gox_file) for gox_file in gox_files]
+            for gox_file, program in zip(gox_files, parsed):
+                self._analyze_file(gox_file, program, parse, not headers_only)
     
-    def _analyze_file(self, file_path: Path) -> None:
-        """Analyze a file and extract basic information"""
+    def _analyze_file(self, file_path: Path, parsed: Future, parse: Callable[[Path], Tuple[Program, str]],
+                      keep_program: bool = True) -> None:
+        """Analyze a parsed file and extract basic information (parse parses
+        it again inline if the worker's result could not be sent back)"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            program, digest = _result(parsed, parse, file_path)
             
-            # Tokenize and parse just to extract package and imports
-            lexer = Lexer(content)
-            tokens = lexer.tokenize()
-            parser = Parser(tokens)
-            program = parser.parse()
-            
-            # Extract local imports (non-stdlib)
-            local_imports = []
-            for imp in program.imports:
-                import_path = imp.path.strip('"')
-                # If it doesn't start with a common stdlib path, assume it's local
-                if not self._is_stdlib_import(import_path):
-                    local_imports.append(import_path)
+            # Extract local imports (non-stdlib), classified once here so
+            # later passes only see local ones. If an import doesn't start
+            # with a common stdlib path, assume it's local.
+            # Names keying the package index and the dependency graph are
+            # interned, as programs from worker processes or the cache
+            # arrive unpickled, with their own copies of every string
+            is_stdlib = self._is_stdlib_import
+            intern = sys.intern
+            local_imports = tuple(intern(import_path) for import_path in (imp.path.strip('"') for imp in program.imports)
+                                  if not is_stdlib(import_path))
+            package = intern(program.package)
             
             # Create file entry
-            rel_path = file_path.relative_to(self.project_root)
+            rel_path = intern(str(file_path.relative_to(self.project_root)))
             project_file = ProjectFile(
                 path=file_path,
-                package=program.package,
+                package=package,
                 imports=local_imports,
-                program=program
+                program=program if keep_program else None,
+                rel_path=rel_path,
+                uses_exceptions=keep_program and _uses_exceptions(program),
+                declares_main=package == 'main' and any(
+                    isinstance(decl, FuncDecl) and decl.name == 'main' for decl in program.declarations),
+                source_hash=digest
             )
             
-            self.files[str(rel_path)] = project_file
+            self.files[rel_path] = project_file
             
             # Group by package
-            if program.package not in self.packages:
-                self.packages[program.package] = []
-            self.packages[program.package].append(project_file)
+            if package not in self.packages:
+                self.packages[package] = []
+            self.packages[package].append(project_file)
             
         except Exception as e:
             print(f"Error analyzing {file_path}: {e}")
+            self.analysis_errors.append(str(file_path))
     
     def _is_stdlib_import(self, import_path: str) -> bool:
         """Check if it's a Go stdlib import"""
-        stdlib_packages = {
-            'fmt', 'os', 'io', 'net', 'http', 'json', 'time', 'strings',
-            'strconv', 'math', 'sort', 'sync', 'context', 'errors',
-            'bufio', 'bytes', 'crypto', 'encoding', 'flag', 'log',
-            'path', 'regexp', 'runtime', 'testing', 'unicode'
-        }
-        
         # Check if it's a stdlib package or subpackage
-        root_package = import_path.split('/')[0]
-        return root_package in stdlib_packages or '.' not in import_path
+        root_package = import_path.partition('/')[0]
+        return root_package in _STDLIB_PACKAGES or '.' not in import_path
     
     def build_dependency_graph(self) -> None:
         """Build dependency graph between files"""
@@ -138,41 +314,42 @@ class ProjectManager:
             deps = set()
             
             for import_path in project_file.imports:
-                # Find files that provide this import
-                for other_path, other_file in self.files.items():
-                    if other_file.package == import_path:
-                        deps.add(other_path)
+                # Files that provide this import, through the package index
+                # (local imports are module paths, whose last element names
+                # the package)
+                for other_file in self.packages.get(import_path.rpartition('/')[2], ()):
+                    if other_file is not project_file:
+                        deps.add(other_file.rel_path)
             
             self.dependency_graph[file_path] = deps
     
     def get_transpilation_order(self) -> List[str]:
         """Return transpilation order based on dependencies"""
-        # Topological sort algorithm
-        visited = set()
-        temp_visited = set()
+        # Topological sort (Kahn): a file is ready once all of its
+        # dependencies are placed, tracked with one counter per file id
+        paths = list(self.files.keys())
+        path_ids = {file_path: i for i, file_path in enumerate(paths)}
+        pending = [0] * len(paths)  # dependencies not yet placed
+        consumers: List[List[int]] = [[] for _ in paths]  # files depending on each file
+        for i, file_path in enumerate(paths):
+            for dep in self.dependency_graph.get(file_path, ()):
+                pending[i] += 1
+                consumers[path_ids[dep]].append(i)
+        
+        ready = deque(i for i, count in enumerate(pending) if count == 0)
         order = []
-        
-        def visit(file_path: str):
-            if file_path in temp_visited:
-                raise ValueError(f"Circular dependency detected involving {file_path}")
-            
-            if file_path in visited:
-                return
-            
-            temp_visited.add(file_path)
-            
-            # Visit dependencies first
-            for dep in self.dependency_graph.get(file_path, set()):
-                visit(dep)
-            
-            temp_visited.remove(file_path)
-            visited.add(file_path)
-            order.append(file_path)
-        
-        # Visit all files
-        for file_path in self.files.keys():
-            if file_path not in visited:
-                visit(file_path)
+        while ready:
+            node = ready.popleft()
+            order.append(paths[node])
+            for consumer in consumers[node]:
+                pending[consumer] -= 1
+                if pending[consumer] == 0:
+                    ready.append(consumer)
+        
+        # Files never ready are on, or depend on, a cycle
+        if len(order) < len(paths):
+            cyclic = [paths[i] for i, count in enumerate(pending) if count > 0]
+            raise ValueError(f"Circular dependency detected involving {', '.join(cyclic)}")
         
         return order
     
@@ -183,8 +360,11 @@ class ProjectManager:
         
         print(f"Transpiling project: {self.config.name}")
         
-        # Discover files
+        # Discover files (a file that cannot be analyzed fails the build,
+        # rather than being left out of it)
         self.discover_files()
+        if self.analysis_errors:
+            raise ValueError(f"{len(self.analysis_errors)} file(s) could not be analyzed")
         print(f"Found {len(self.files)} .gox files")
         
         # Build dependency graph
@@ -209,32 +389,120 @@ class ProjectManager:
             self._generate_exceptions_file(output_dir)
         
         # Transpile files in the correct order
+        # (files are independent, so they are transpiled in parallel and
+        # saved in order as they complete)
         project_transpiler = ProjectTranspiler(self, global_exceptions)
         
-        for file_path in order:
-            project_file = self.files[file_path]
-            print(f"Transpiling {file_path} (package {project_file.package})")
+        # Files whose sources, dependencies and project settings match the
+        # manifest of the previous build are not transpiled again
+        settings = f"{self.config.go_mod_name}:{global_exceptions}"
+        manifest = self._load_manifest(output_dir)
+        build_keys = self._build_keys(order, settings)
+        
+        # The others may still have been generated before (in another output
+        # directory, or before a clean), as a file's code depends only on its
+        # source and the settings
+        output_cache = OutputCache(self.cache_dir) if self.cache_dir else None
+        output_keys = {file_path: _output_key(self.files[file_path].source_hash, settings) for file_path in order}
+        
+        created_dirs: Set[Path] = set()
+        with _executor(len(order), self.max_workers) as executor:
+            transpiled: Dict[str, Future] = {}
+            cached: Set[str] = set()
+            for file_path in order:
+                output_path = output_dir / Path(file_path).with_suffix('.go')
+                if manifest.get(file_path) == build_keys[file_path] and output_path.exists():
+                    continue
+                cached_code = output_cache.load(output_keys[file_path]) if output_cache else None
+                if cached_code is not None:
+                    transpiled[file_path] = Future()
+                    transpiled[file_path].set_result(cached_code)
+                    cached.add(file_path)
+                else:
+                    transpiled[file_path] = executor.submit(project_transpiler.transpile_file,
+                                                            self.files[file_path], file_path)
             
-            # Determine output path
-            rel_path = Path(file_path)
-            output_path = output_dir / rel_path.with_suffix('.go')
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            # Transpile with project context
-            go_code = project_transpiler.transpile_file(project_file, file_path)
-            
-            # Save
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(go_code)
-            
-            project_file.transpiled = True
-            print(f"Generated: {file_path} -> {output_path}")
+            for file_path in order:
+                project_file = self.files[file_path]
+                
+                # Determine output path
+                rel_path = Path(file_path)
+                output_path = output_dir / rel_path.with_suffix('.go')
+                
+                go_code = transpiled.get(file_path)
+                if go_code is None:
+                    print(f"Up to date: {file_path}")
+                else:
+                    if file_path in cached:
+                        print(f"Cached: {file_path} (package {project_file.package})")
+                    else:
+                        print(f"Transpiling {file_path} (package {project_file.package})")
+                    if output_path.parent not in created_dirs:
+                        output_path.parent.mkdir(parents=True, exist_ok=True)
+                        created_dirs.add(output_path.parent)
+                    
+                    # Save (unchanged files are left alone, keeping their mtime
+                    # for the Go build cache)
+                    code = _result(go_code, project_transpiler.transpile_file, project_file, file_path)
+                    if _write_if_changed(output_path, code):
+                        print(f"Generated: {file_path} -> {output_path}")
+                    else:
+                        print(f"Unchanged: {file_path} -> {output_path}")
+                    if output_cache and file_path not in cached:
+                        output_cache.store(output_keys[file_path], code)
+                    manifest[file_path] = build_keys[file_path]
+                project_file.transpiled = True
+                
+                if self.main_file is None and project_file.declares_main:
+                    self.main_file = output_path
+                
+                # The AST is not needed once the file is written
+                project_file.program = None
+        
+        self._save_manifest(output_dir, manifest)
+        
+        # Entries for sources no longer in the project would otherwise
+        # accumulate forever
+        if self.cache_dir is not None:
+            ASTCache(self.cache_dir).prune({project_file.source_hash for project_file in self.files.values()})
+        if output_cache is not None:
+            output_cache.prune(set(output_keys.values()))
         
         # Generate go.mod if needed
         self._generate_go_mod(output_dir)
         
         print(f"Project successfully transpiled to {output_dir}")
     
+    def _build_keys(self, order: List[str], settings: str) -> Dict[str, str]:
+        """Key each file by its source, its dependencies' keys and the
+        project settings (order lists dependencies first)"""
+        keys: Dict[str, str] = {}
+        for file_path in order:
+            parts = [self.files[file_path].source_hash, settings]
+            parts.extend(sorted(keys[dep] for dep in self.dependency_graph.get(file_path, ())))
+            keys[file_path] = hashlib.blake2b('\n'.join(parts).encode('utf-8'), digest_size=16).hexdigest()
+        return keys
+    
+    def _load_manifest(self, output_dir: Path) -> Dict[str, str]:
+        """Load the build keys of the previous build (empty without the cache)"""
+        if self.cache_dir is None:
+            return {}
+        try:
+            with open(output_dir / MANIFEST_NAME, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return manifest if isinstance(manifest, dict) else {}
+    
+    def _save_manifest(self, output_dir: Path, manifest: Dict[str, str]) -> None:
+        """Save the build keys of this build"""
+        if self.cache_dir is None:
+            return
+        
+        # Files no longer in the project are dropped
+        manifest = {file_path: key for file_path, key in manifest.items() if file_path in self.files}
+        _write_if_changed(output_dir / MANIFEST_NAME, json.dumps(manifest, indent=2, sort_keys=True))
+    
     def _generate_go_mod(self, output_dir: Path) -> None:
         """Generate go.mod file"""
         go_mod_path = output_dir / "go.mod"
@@ -250,7 +518,8 @@ class ProjectManager:
         if not self.config:
             self.load_config()
         
-        self.discover_files()
+        # Only packages and imports are shown, so the headers are enough
+        self.discover_files(headers_only=True)
         self.build_dependency_graph()
         
         print(f"Project Information: {self.config.name}")
@@ -296,6 +565,15 @@ class ProjectManager:
         # Save configuration
         self.save_config()
         
+        # The cache holds pickles, which must never be committed or shared
+        gitignore = self.project_root / ".gitignore"
+        ignored = gitignore.read_text(encoding='utf-8') if gitignore.exists() else ""
+        if f"{CACHE_DIR_NAME}/" not in ignored.splitlines():
+            with open(gitignore, 'a', encoding='utf-8') as f:
+                if ignored and not ignored.endswith('\n'):
+                    f.write('\n')
+                f.write(f"{CACHE_DIR_NAME}/\n")
+        
         # Create basic example
         example_file = self.project_root / self.config.source_dir / "main.gox"
         if not example_file.exists():
@@ -324,34 +602,7 @@ func main() {{
     
     def _analyze_global_exceptions(self) -> bool:
         """Analyze if any file uses exceptions"""
-        for project_file in self.files.values():
-            if self._file_uses_exceptions(project_file.program):
-                return True
-        return False
-    
-    def _file_uses_exceptions(self, node) -> bool:
-        """Check if a file uses exceptions"""
-        if isinstance(node, (TryStmt, ThrowStmt)):
-            return True
-        elif isinstance(node, CallExpr) and isinstance(node.function, Identifier):
-            if node.function.name == 'NewException':
-                return True
-        
-        # Recurse through all attributes
-        for attr_name in dir(node):
-            if attr_name.startswith('_'):
-                continue
-            attr = getattr(node, attr_name)
-            if isinstance(attr, list):
-                for item in attr:
-                    if hasattr(item, '__class__') and issubclass(item.__class__, ASTNode):
-                        if self._file_uses_exceptions(item):
-                            return True
-            elif hasattr(attr, '__class__') and issubclass(attr.__class__, ASTNode):
-                if self._file_uses_exceptions(attr):
-                    return True
-        
-        return False
+        return any(project_file.uses_exceptions for project_file in self.files.values())
     
     def _generate_exceptions_file(self, output_dir: Path) -> None:
         """Generate common exceptions file"""
@@ -399,7 +650,9 @@ class ProjectTranspiler:
     """Specialized transpiler for projects"""
     
     def __init__(self, project_manager: ProjectManager, has_exceptions: bool):
-        self.project_manager = project_manager
+        # Only the settings are kept, so the transpiler is cheap to send
+        # to worker processes
+        self.go_mod_name = project_manager.config.go_mod_name
         self.has_exceptions = has_exceptions
     
     def transpile_file(self, project_file: ProjectFile, file_path: str) -> str:
@@ -411,14 +664,15 @@ class ProjectTranspiler:
         
         # Transpile the program
         program = project_file.program
+        if program is None:
+            raise ValueError(f"{file_path} has no program to transpile")
         
         # Modify imports if necessary
-        if self.has_exceptions and self._program_uses_exceptions(program):
+        if self.has_exceptions and project_file.uses_exceptions:
             # Add import for exceptions if using exceptions
             from ast_nodes import ImportDecl
-            go_mod_name = self.project_manager.config.go_mod_name
-            exceptions_import = ImportDecl(f"{go_mod_name}/exceptions")
-            program.imports.append(exceptions_import)
+            exceptions_import = ImportDecl(f"{self.go_mod_name}/exceptions")
+            program = replace(program, imports=(*program.imports, exceptions_import))
         
         # Transpile
         go_code = transpiler.transpile(program)
@@ -429,61 +683,40 @@ class ProjectTranspiler:
         
         return go_code
     
-    def _program_uses_exceptions(self, program) -> bool:
-        """Check if the program uses exceptions"""
-        return self.project_manager._file_uses_exceptions(program)
-    
     def _remove_exception_definitions(self, go_code: str) -> str:
         """Remove duplicate exception definitions"""
-        lines = go_code.split('\n')
-        filtered_lines = []
-        skip_block = False
-        in_import_block = False
-        
-        i = 0
-        while i < len(lines):
-            line = lines[i]
+        # Only the lines of the rewritten blocks are handled one by one;
+        # every kept line is followed by a newline until the end
+        kept = []
+        pos: Optional[int] = 0  # start of the next line, None past the last line
+        
+        while pos is not None:
+            line_start, line_end, is_exceptions = _next_rewrite(go_code, pos)
+            if line_start == -1:
+                kept.append(go_code[pos:] + '\n')
+                break
+            kept.append(go_code[pos:line_start])
             
-            # Detect start of exception block
-            if '// Exception types' in line:
-                skip_block = True
-                # Skip until finding a blank line after the block
-                while i < len(lines) and not (lines[i].strip() == '' and i + 1 < len(lines) and 
-                                             (lines[i + 1].startswith('type ') or lines[i + 1].startswith('func ') or 
-                                              lines[i + 1].strip() == '')):
-                    i += 1
-                skip_block = False
-                i += 1
+            if is_exceptions:
+                # Skip through the blank line that ends the block
+                end = _EXCEPTIONS_END_RE.search(go_code, line_end)
+                pos = end.end() if end else None
                 continue
             
-            # Detect import block
-            if line.strip() == 'import (':
-                in_import_block = True
-                # Collect all imports
-                import_lines = [line]
-                i += 1
-                while i < len(lines) and lines[i].strip() != ')':
-                    import_line = lines[i]
-                    # Remove fmt and errors imports if only for exceptions
-                    if import_line.strip() not in ['"fmt"', '"errors"']:
-                        import_lines.append(import_line)
-                    i += 1
-                
-                # Add closing parenthesis
-                if i < len(lines):
-                    import_lines.append(lines[i])  # )
-                
-                # Only add block if it contains more than fmt/errors
-                if len(import_lines) > 2:  # More than import( and )
-                    filtered_lines.extend(import_lines)
-                
-                in_import_block = False
-                i += 1
-                continue
+            # Import block: drop fmt and errors, which only the removed
+            # definitions needed
+            end = _IMPORT_END_RE.search(go_code, line_end)
+            body_end = end.start() - 1 if end else len(go_code)
+            body = go_code[line_end + 1:body_end].split('\n') if line_end < body_end else []
+            import_lines = [go_code[line_start:line_end]]
+            import_lines.extend(line for line in body if line.strip() not in ('"fmt"', '"errors"'))
+            if end:
+                import_lines.append(end.group())
             
-            if not skip_block:
-                filtered_lines.append(line)
+            # Only add block if it contains more than import( and )
+            if len(import_lines) > 2:
+                kept.extend(line + '\n' for line in import_lines)
             
-            i += 1
+            pos = end.end() + 1 if end and end.end() < len(go_code) else None
         
-        return '\n'.join(filtered_lines)
+        return ''.join(kept)[:-1]
@@ -5,7 +5,12 @@ Tests for the Go-Extended transpiler
 
 import os
 import sys
+import shutil
+import tempfile
+from contextlib import contextmanager, redirect_stdout
+from io import StringIO
 from pathlib import Path
+from typing import List
 
 # Adiciona o diretório atual ao path
 sys.path.insert(0, str(Path(__file__).parent))
@@ -13,6 +18,10 @@ sys.path.insert(0, str(Path(__file__).parent))
 from lexer import Lexer
 from parser import Parser
 from transpiler import Transpiler
+from ast_nodes import Identifier, MapLiteral, StructLiteral, walk
+import main
+from project_manager import ProjectManager, PARALLEL_MIN_FILES, CACHE_DIR_NAME
+from build_cache import source_hash
 
 def test_lexer():
     """Tests the lexer"""
@@ -120,6 +129,255 @@ def test_transpiler():
     
     print("Transpiler OK!\n")
 
+def test_range_loop():
+    """Tests for range loops"""
+    print("=== Testing Range Loop ===")
+    
+    code = '''
+    package main
+    
+    func main() {
+        for i, x := range items {
+            total += x
+        }
+    }
+    '''
+    
+    lexer = Lexer(code)
+    tokens = lexer.tokenize()
+    
+    parser = Parser(tokens)
+    ast = parser.parse()
+    
+    transpiler = Transpiler()
+    go_code = transpiler.transpile(ast)
+    
+    assert 'for i, x := range items {' in go_code
+    print("Range loop OK!\n")
+
+def test_parentheses():
+    """Tests parentheses in generated expressions"""
+    print("=== Testing Parentheses ===")
+    
+    code = '''
+    package main
+    
+    func main() {
+        x := (a + b) * c - (d - e)
+        if a == b < c && !(a || b) {
+            x = -(-x)
+        }
+    }
+    '''
+    
+    lexer = Lexer(code)
+    tokens = lexer.tokenize()
+    
+    parser = Parser(tokens)
+    ast = parser.parse()
+    
+    transpiler = Transpiler()
+    go_code = transpiler.transpile(ast)
+    
+    assert 'x := (a + b) * c - (d - e)' in go_code
+    assert 'if a == (b < c) && !(a || b) {' in go_code
+    assert 'x = -(-x)' in go_code
+    print("Parentheses OK!\n")
+
+def test_walk():
+    """Tests that walk reaches the nodes in map pairs and struct fields"""
+    print("=== Testing Walk ===")
+    
+    key, value, field = Identifier('k'), Identifier('v'), Identifier('f')
+    literal = MapLiteral(pairs=((key, StructLiteral(type='Point', fields=(('X', field),))),
+                                (Identifier('k2'), value)))
+    nodes = list(walk(literal))
+    assert len(nodes) == 6
+    assert all(any(node is expected for node in nodes) for expected in (key, value, field))
+    
+    print("Walk OK!\n")
+
+@contextmanager
+def _user_cache_dir():
+    """Points the user cache directory at a temporary directory, yielded"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        old_cache_home = os.environ.get('XDG_CACHE_HOME')
+        os.environ['XDG_CACHE_HOME'] = temp_dir
+        try:
+            yield Path(temp_dir)
+        finally:
+            if old_cache_home is None:
+                del os.environ['XDG_CACHE_HOME']
+            else:
+                os.environ['XDG_CACHE_HOME'] = old_cache_home
+
+def _write_sources(project_root: Path, sources: dict) -> None:
+    """Writes each relative path in sources, under the project's src directory"""
+    for rel_path, code in sources.items():
+        source_file = project_root / "src" / rel_path
+        source_file.parent.mkdir(parents=True, exist_ok=True)
+        source_file.write_text(code, encoding='utf-8')
+
+def _build(project_root: Path) -> List[str]:
+    """Builds the project, returning the lines it printed"""
+    output = StringIO()
+    with redirect_stdout(output):
+        ProjectManager(project_root).transpile_project()
+    return output.getvalue().splitlines()
+
+def _long_expression(func: str = 'main') -> str:
+    """Returns a program whose expression is nested deeper than the recursion
+    limit, and too deep to pickle"""
+    terms = ' + '.join(['a'] * 5000)
+    return f'''
+    package main
+    
+    func {func}() {{
+        x := {terms}
+    }}
+    '''
+
+def test_long_expression():
+    """Tests expressions nested deeper than the recursion limit"""
+    print("=== Testing Long Expression ===")
+    
+    code = _long_expression()
+    
+    lexer = Lexer(code)
+    tokens = lexer.tokenize()
+    
+    parser = Parser(tokens)
+    ast = parser.parse()
+    
+    transpiler = Transpiler()
+    go_code = transpiler.transpile(ast)
+    
+    assert 'x := a + a + a' in go_code
+    assert go_code.count(' + ') == 4999
+    print("Long expression OK!\n")
+
+def test_long_expression_file():
+    """Tests transpiling a long expression file with the AST cache enabled"""
+    print("=== Testing Long Expression File ===")
+    
+    with _user_cache_dir() as temp_dir:
+        input_file = temp_dir / "long.gox"
+        input_file.write_text(_long_expression(), encoding='utf-8')
+        output_file = main.transpile(input_file, use_cache=True)
+        assert output_file.exists()
+        assert output_file.read_text(encoding='utf-8').count(' + ') == 4999
+    
+    print("Long expression file OK!\n")
+
+def test_long_expression_project():
+    """Tests building long expression files in a process pool, with the AST
+    and output caches enabled"""
+    print("=== Testing Long Expression Project ===")
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        project_root = Path(temp_dir)
+        _write_sources(project_root, {f"f{i}.gox": _long_expression('main' if i == 0 else f'f{i}')
+                                      for i in range(PARALLEL_MIN_FILES)})
+        # Two workers use a pool even on a single CPU
+        ProjectManager(project_root, max_workers=2).transpile_project()
+        for i in range(PARALLEL_MIN_FILES):
+            output_file = project_root / "build" / "src" / f"f{i}.go"
+            assert output_file.exists()
+            assert output_file.read_text(encoding='utf-8').count(' + ') == 4999
+    
+    print("Long expression project OK!\n")
+
+def test_output_mode():
+    """Tests that rebuilt outputs keep their mode, and new ones follow the umask"""
+    print("=== Testing Output Mode ===")
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        project_root = Path(temp_dir)
+        output_file = project_root / "build" / "src" / "main.go"
+        old_umask = os.umask(0o022)
+        try:
+            _write_sources(project_root, {"main.gox": "package main\n\nfunc main() {\n}\n"})
+            ProjectManager(project_root).transpile_project()
+            assert output_file.stat().st_mode & 0o777 == 0o644
+            
+            output_file.chmod(0o664)
+            _write_sources(project_root, {"main.gox": "package main\n\nfunc main() {\n    x := 1\n}\n"})
+            ProjectManager(project_root).transpile_project()
+            assert 'x := 1' in output_file.read_text(encoding='utf-8')
+            assert output_file.stat().st_mode & 0o777 == 0o664
+        finally:
+            os.umask(old_umask)
+    
+    print("Output mode OK!\n")
+
+def test_incremental_build():
+    """Tests that rebuilds skip unchanged files and redo the dependents of
+    changed ones"""
+    print("=== Testing Incremental Build ===")
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        project_root = Path(temp_dir)
+        _write_sources(project_root, {
+            "utils/utils.gox": "package utils\n\nfunc Double(x int) int {\n    return x * 2\n}\n",
+            "main/main.gox": "package main\n\nimport \"example.com/app/utils\"\n\nfunc main() {\n    x := utils.Double(2)\n}\n",
+            "other/other.gox": "package other\n\nfunc Other() {\n}\n",
+        })
+        _build(project_root)
+        outputs = sorted((project_root / "build").rglob('*.go'))
+        mtimes = [output.stat().st_mtime_ns for output in outputs]
+        
+        # Nothing changed: nothing is transpiled or written
+        lines = _build(project_root)
+        assert "Up to date: src/utils/utils.gox" in lines
+        assert "Up to date: src/main/main.gox" in lines
+        assert "Up to date: src/other/other.gox" in lines
+        assert not [line for line in lines if line.startswith(("Transpiling src/", "Generated: src/", "Unchanged: "))]
+        assert [output.stat().st_mtime_ns for output in outputs] == mtimes
+        
+        # A changed file is transpiled again, and so are the files importing it
+        _write_sources(project_root, {"utils/utils.gox": "package utils\n\nfunc Double(x int) int {\n    return x + x\n}\n"})
+        lines = _build(project_root)
+        assert "Transpiling src/utils/utils.gox (package utils)" in lines
+        assert "Generated: src/utils/utils.gox -> " + str(project_root / "build" / "src" / "utils" / "utils.go") in lines
+        assert "Up to date: src/main/main.gox" not in lines
+        assert "Up to date: src/other/other.gox" in lines
+        assert 'x + x' in (project_root / "build" / "src" / "utils" / "utils.go").read_text(encoding='utf-8')
+    
+    print("Incremental build OK!\n")
+
+def test_build_cache():
+    """Tests that generated code is reused from the cache after a clean, and
+    that entries of sources no longer in the project are pruned"""
+    print("=== Testing Build Cache ===")
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        project_root = Path(temp_dir)
+        sources = {
+            "main.gox": "package main\n\nfunc main() {\n}\n",
+            "other.gox": "package main\n\nfunc Other() {\n}\n",
+        }
+        _write_sources(project_root, sources)
+        _build(project_root)
+        
+        # A clean build needs no transpiling, only the cached code
+        shutil.rmtree(project_root / "build")
+        lines = _build(project_root)
+        assert "Cached: src/main.gox (package main)" in lines
+        assert "Cached: src/other.gox (package main)" in lines
+        assert (project_root / "build" / "src" / "other.go").exists()
+        
+        # Entries of edited and removed sources are pruned
+        sources["main.gox"] = "package main\n\nfunc main() {\n    x := 1\n}\n"
+        del sources["other.gox"]
+        _write_sources(project_root, sources)
+        (project_root / "src" / "other.gox").unlink()
+        _build(project_root)
+        cache_dir = project_root / CACHE_DIR_NAME
+        assert {entry.stem for entry in (cache_dir / "ast").iterdir()} == {source_hash(sources["main.gox"])}
+        assert len(list((cache_dir / "go").iterdir())) == 1
+    
+    print("Build cache OK!\n")
+
 def test_file_example():
     """Tests with example file"""
     print("=== Testing with Example File ===")
@@ -164,6 +422,15 @@ if __name__ == '__main__':
         test_lexer()
         test_parser()
         test_transpiler()
+        test_range_loop()
+        test_parentheses()
+        test_walk()
+        test_long_expression()
+        test_long_expression_file()
+        test_long_expression_project()
+        test_output_mode()
+        test_incremental_build()
+        test_build_cache()
         test_file_example()
         
         print("All tests passed!")
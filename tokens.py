@@ -2,11 +2,14 @@
 Token definitions for Go-Extended
 """
 
-from enum import Enum, auto
+from array import array
+from bisect import bisect_right
+from collections.abc import Sequence
+from enum import IntEnum, auto
 from dataclasses import dataclass
-from typing import Any, Optional
+from typing import AbstractSet, Any, Dict, Iterator, List, Optional, Tuple, Union, overload
 
-class TokenType(Enum):
+class TokenType(IntEnum):
     # Literal Types
     IDENTIFIER = auto()
     NUMBER = auto()
@@ -108,19 +111,96 @@ class TokenType(Enum):
     EOF = auto()
     COMMENT = auto()
 
-@dataclass
+@dataclass(slots=True)
 class Token:
     type: TokenType
     value: str
     line: int
     column: int
     
-    def __str__(self):
+    def __str__(self) -> str:
         return f"Token({self.type.name}, '{self.value}', {self.line}:{self.column})"
     
-    def __repr__(self):
+    def __repr__(self) -> str:
         return self.__str__()
 
+# TokenType members by value, to decode packed type tags
+_TYPES_BY_VALUE: Dict[int, TokenType] = {t.value: t for t in TokenType}
+
+class TokenArray(Sequence[Token]):
+    """Token sequence stored as parallel arrays (structure of arrays)
+    
+    Each token costs one byte for its type tag, one string reference and
+    its offset in the source. Lines and columns are resolved from the
+    offset through a table of line start offsets, and Token objects are
+    only built when an element is accessed.
+    """
+    
+    def __init__(self, line_starts: Optional[List[int]] = None):
+        self.types = array('B')
+        self.values: List[str] = []
+        self.positions = array('I')
+        self.line_starts: List[int] = line_starts if line_starts is not None else [0]
+    
+    def append(self, token_type: TokenType, value: str, position: int) -> None:
+        """Appends a token"""
+        self.types.append(token_type.value)
+        self.values.append(value)
+        self.positions.append(position)
+    
+    def location(self, position: int) -> Tuple[int, int]:
+        """Returns the (line, column) of a source offset, both 1-based"""
+        line = bisect_right(self.line_starts, position)
+        return line, position - self.line_starts[line - 1] + 1
+    
+    def token(self, index: int) -> Token:
+        """Builds the Token at the given index"""
+        line, column = self.location(self.positions[index])
+        return Token(_TYPES_BY_VALUE[self.types[index]], self.values[index], line, column)
+    
+    def iter_without(self, skip: AbstractSet[TokenType]) -> Iterator[Token]:
+        """Yields the Tokens whose type is not in skip, building each only
+        when it is reached and leaving the others unbuilt"""
+        skip_tags = {token_type.value for token_type in skip}
+        types = self.types
+        values = self.values
+        positions = self.positions
+        line_starts = self.line_starts
+        types_by_value = _TYPES_BY_VALUE
+        for i in range(len(types)):
+            tag = types[i]
+            if tag in skip_tags:
+                continue
+            position = positions[i]
+            line = bisect_right(line_starts, position)
+            yield Token(types_by_value[tag], values[i], line, position - line_starts[line - 1] + 1)
+    
+    def without(self, skip: AbstractSet[TokenType]) -> List[Token]:
+        """Builds the Tokens whose type is not in skip, leaving the others unbuilt"""
+        return list(self.iter_without(skip))
+    
+    def __len__(self) -> int:
+        return len(self.values)
+    
+    @overload
+    def __getitem__(self, index: int) -> Token: ...
+    
+    @overload
+    def __getitem__(self, index: slice) -> List[Token]: ...
+    
+    def __getitem__(self, index: Union[int, slice]) -> Union[Token, List[Token]]:
+        if isinstance(index, slice):
+            return [self.token(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("token index out of range")
+        return self.token(index)
+    
+    def __iter__(self) -> Iterator[Token]:
+        for i in range(len(self)):
+            yield self.token(i)
+
 # Keyword mapping
 KEYWORDS = {
     # Standard Go
@@ -3,71 +3,221 @@ Go-Extended to Go transpiler
 Converts Go-Extended AST to standard Go code
 """
 
-from typing import List, Dict, Set, Optional
+import io
+from functools import lru_cache
+from typing import List, Dict, Set, Optional, Callable, Tuple, cast
 from ast_nodes import *
 
 class TranspilerError(Exception):
     """Transpiler error"""
     pass
 
+# Indentation prefixes by level, extended as deeper levels are reached
+_INDENTS = ['']
+
+# Go definitions of the exception types, as emitted line by line
+_EXCEPTION_TYPES_GO = """\
+// Exception types
+type Exception interface {
+    Error() string
+    Type() string
+}
+
+type BaseException struct {
+    message string
+    exType string
+}
+
+func (e *BaseException) Error() string {
+    return e.message
+}
+
+func (e *BaseException) Type() string {
+    return e.exType
+}
+
+func NewException(exType, message string) Exception {
+    return &BaseException{message: message, exType: exType}
+}
+"""
+
+# Fixed parts of a try statement with catch blocks, as (depth, line) pairs
+# relative to the statement's func() wrapper: the recover prologue, which
+# leaves ex set for the catch chain, and the closing braces after it
+_TRY_RECOVER = (
+    (0, 'defer func() {'),
+    (1, 'if r := recover(); r != nil {'),
+    (2, 'var ex Exception'),
+    (2, 'if e, ok := r.(Exception); ok {'),
+    (3, 'ex = e'),
+    (2, '} else {'),
+    (3, 'ex = NewException("RuntimeError", fmt.Sprintf("%v", r))'),
+    (2, '}'),
+    (2, ''),
+)
+_TRY_RECOVER_END = (
+    (2, '}'),
+    (1, '}'),
+    (0, '}()'),
+)
+
+# Go's binary operator precedences, which decide where the generated code
+# needs parentheses (unary operators bind tighter, and postfix ones, like
+# calls and selectors, tighter still)
+_GO_PRECEDENCE = {
+    '||': 1,
+    '&&': 2,
+    '==': 3, '!=': 3, '<': 3, '<=': 3, '>': 3, '>=': 3,
+    '+': 4, '-': 4, '|': 4, '^': 4,
+    '*': 5, '/': 5, '%': 5, '<<': 5, '>>': 5, '&': 5, '&^': 5,
+}
+_UNARY_PRECEDENCE = 6
+_POSTFIX_PRECEDENCE = 7
+
+def _binds_looser(expr: Expression, precedence: int) -> bool:
+    """Whether expr, as an operand, binds looser than precedence in Go"""
+    kind = expr.KIND
+    if kind is NodeKind.BINARY_EXPR:
+        return _GO_PRECEDENCE.get(cast(BinaryExpr, expr).operator, 0) < precedence
+    return kind is NodeKind.UNARY_EXPR and precedence > _UNARY_PRECEDENCE
+
+def _indentation(level: int) -> str:
+    """Returns the indentation prefix for the level"""
+    while level >= len(_INDENTS):
+        _INDENTS.append(_INDENTS[-1] + '    ')
+    return _INDENTS[level]
+
+@lru_cache(maxsize=None)
+def _render_template(template: Tuple[Tuple[int, str], ...], level: int) -> str:
+    """Renders a fixed block of lines at the indentation level, as _emit would"""
+    return ''.join([_indentation(level + depth) + line + '\n' if line else '\n' for depth, line in template])
+
+@lru_cache(maxsize=1024)
+def _quote_import(path: str) -> str:
+    """Returns the import path in quotes; the same paths recur across the
+    files of a project"""
+    return path if path[:1] == '"' and path[-1:] == '"' else f'"{path}"'
+
+def _format_params(params: Tuple[Parameter, ...]) -> str:
+    """Renders a parameter list as Go source"""
+    return ', '.join([p.name + ' ' + p.type for p in params])
+
 class Transpiler:
     def __init__(self, project_mode=False):
-        self.output = []
+        self.output = io.StringIO()
         self.indent_level = 0
+        self._indent_str = ''
+        self._literal_memo: Dict[int, str] = {}
         self.classes: Dict[str, ClassDecl] = {}
         self.exception_types: Set[str] = set()
         self.current_class = None
         self.current_receiver = 'this'
         self.project_mode = project_mode  # If True, does not generate exception types
         
+        # Handlers indexed by node kind
+        self._decl_dispatch: List[Optional[Callable]] = [None] * (len(NodeKind) + 1)
+        self._decl_dispatch[NodeKind.FUNC_DECL] = self._emit_func_decl
+        self._decl_dispatch[NodeKind.VAR_DECL] = self._emit_var_decl
+        self._decl_dispatch[NodeKind.CONST_DECL] = self._emit_const_decl
+        self._decl_dispatch[NodeKind.TYPE_DECL] = self._emit_type_decl
+        self._decl_dispatch[NodeKind.STRUCT_DECL] = self._emit_struct_decl
+        self._decl_dispatch[NodeKind.INTERFACE_DECL] = self._emit_interface_decl
+        self._decl_dispatch[NodeKind.CLASS_DECL] = self._emit_class_decl
+        self._stmt_dispatch: List[Optional[Callable]] = [None] * (len(NodeKind) + 1)
+        self._stmt_dispatch[NodeKind.BLOCK_STMT] = self._emit_block
+        self._stmt_dispatch[NodeKind.EXPRESSION_STMT] = self._emit_expression_stmt
+        self._stmt_dispatch[NodeKind.VAR_DECL] = self._emit_var_stmt
+        self._stmt_dispatch[NodeKind.ASSIGN_STMT] = self._emit_assign_stmt
+        self._stmt_dispatch[NodeKind.IF_STMT] = self._emit_if_stmt
+        self._stmt_dispatch[NodeKind.FOR_STMT] = self._emit_for_stmt
+        self._stmt_dispatch[NodeKind.RANGE_STMT] = self._emit_range_stmt
+        self._stmt_dispatch[NodeKind.SWITCH_STMT] = self._emit_switch_stmt
+        self._stmt_dispatch[NodeKind.RETURN_STMT] = self._emit_return_stmt
+        self._stmt_dispatch[NodeKind.BREAK_STMT] = self._emit_break_stmt
+        self._stmt_dispatch[NodeKind.CONTINUE_STMT] = self._emit_continue_stmt
+        self._stmt_dispatch[NodeKind.GO_STMT] = self._emit_go_stmt
+        self._stmt_dispatch[NodeKind.DEFER_STMT] = self._emit_defer_stmt
+        self._stmt_dispatch[NodeKind.TRY_STMT] = self._emit_try_stmt
+        self._stmt_dispatch[NodeKind.THROW_STMT] = self._emit_throw_stmt
+        self._stmt_string_dispatch: List[Optional[Callable]] = [None] * (len(NodeKind) + 1)
+        self._stmt_string_dispatch[NodeKind.VAR_DECL] = self._var_stmt_to_string
+        self._stmt_string_dispatch[NodeKind.ASSIGN_STMT] = self._assign_stmt_to_string
+        self._stmt_string_dispatch[NodeKind.EXPRESSION_STMT] = self._expression_stmt_to_string
+        # Expressions without operands are rendered directly; the others
+        # list their operands, then combine the operands' rendered text
+        self._expr_dispatch: List[Optional[Callable]] = [None] * (len(NodeKind) + 1)
+        self._expr_dispatch[NodeKind.IDENTIFIER] = self._identifier_to_string
+        self._expr_dispatch[NodeKind.LITERAL] = self._literal_to_string
+        self._expr_dispatch[NodeKind.THIS_EXPR] = self._this_to_string
+        self._expr_dispatch[NodeKind.SUPER_EXPR] = self._super_to_string
+        self._operands_dispatch: List[Optional[Callable]] = [None] * (len(NodeKind) + 1)
+        self._operands_dispatch[NodeKind.BINARY_EXPR] = self._binary_operands
+        self._operands_dispatch[NodeKind.UNARY_EXPR] = self._unary_operands
+        self._operands_dispatch[NodeKind.CALL_EXPR] = self._call_operands
+        self._operands_dispatch[NodeKind.INDEX_EXPR] = self._index_operands
+        self._operands_dispatch[NodeKind.SELECTOR_EXPR] = self._selector_operands
+        self._operands_dispatch[NodeKind.NEW_EXPR] = self._new_operands
+        self._combine_dispatch: List[Optional[Callable]] = [None] * (len(NodeKind) + 1)
+        self._combine_dispatch[NodeKind.BINARY_EXPR] = self._binary_to_string
+        self._combine_dispatch[NodeKind.UNARY_EXPR] = self._unary_to_string
+        self._combine_dispatch[NodeKind.CALL_EXPR] = self._call_to_string
+        self._combine_dispatch[NodeKind.INDEX_EXPR] = self._index_to_string
+        self._combine_dispatch[NodeKind.SELECTOR_EXPR] = self._selector_to_string
+        self._combine_dispatch[NodeKind.NEW_EXPR] = self._new_to_string
+        
     def transpile(self, program: Program) -> str:
         """Transpiles the program to Go"""
-        self.output = []
+        self._generate(program)
+        return self._result()
+    
+    def _result(self) -> str:
+        """Returns the generated code, without the last line's newline"""
+        return self.output.getvalue()[:-1]
+    
+    def _generate(self, program: Program) -> None:
+        """Generates the output lines for the program"""
+        self.output = io.StringIO()
         self.indent_level = 0
+        self._indent_str = ''
+        self._literal_memo = {}
         
-        # First pass: collect class information
-        self._collect_classes(program)
+        # First pass: collect classes and exception usage
+        self._collect_info(program)
         
         # Second pass: generate code
         self._emit_program(program)
-        
-        return '\n'.join(self.output)
     
-    def _collect_classes(self, program: Program) -> None:
-        """Collects information about classes and exceptions"""
+    def _collect_info(self, program: Program) -> None:
+        """Collects classes and exception usage in one pass over the program"""
+        uses_exceptions = bool(self.exception_types)
         for decl in program.declarations:
             if isinstance(decl, ClassDecl):
                 self.classes[decl.name] = decl
-        
-        # Detect exception usage
-        self._detect_exceptions(program)
-    
-    def _detect_exceptions(self, node) -> None:
-        """Recursively detects exception usage"""
-        if isinstance(node, (TryStmt, ThrowStmt)):
-            self.exception_types.add('Exception')
-        elif isinstance(node, CallExpr) and isinstance(node.function, Identifier):
-            if node.function.name == 'NewException':
-                self.exception_types.add('Exception')
-        
-        # Recurse into all attributes that are lists or nodes
-        for attr_name in dir(node):
-            if attr_name.startswith('_'):
+            
+            # Classes are top-level only, so declarations are walked just
+            # until the first exception use is found
+            if uses_exceptions:
                 continue
-            attr = getattr(node, attr_name)
-            if isinstance(attr, list):
-                for item in attr:
-                    if hasattr(item, '__class__') and issubclass(item.__class__, ASTNode):
-                        self._detect_exceptions(item)
-            elif hasattr(attr, '__class__') and issubclass(attr.__class__, ASTNode):
-                self._detect_exceptions(attr)
+            for node in walk(decl):
+                if isinstance(node, (TryStmt, ThrowStmt)):
+                    uses_exceptions = True
+                    break
+                elif isinstance(node, CallExpr) and isinstance(node.function, Identifier):
+                    if node.function.name == 'NewException':
+                        uses_exceptions = True
+                        break
+        
+        if uses_exceptions:
+            self.exception_types.add('Exception')
     
     def _emit(self, text: str) -> None:
         """Emits text with indentation"""
+        # Every line is written newline-terminated into one buffer
+        write = self.output.write
         if text.strip():
-            self.output.append('    ' * self.indent_level + text)
-        else:
-            self.output.append('')
+            write(self._indent_str)
+            write(text)
+        write('\n')
     
     def _emit_line(self, text: str = '') -> None:
         """Emits a line"""
@@ -76,10 +226,28 @@ class Transpiler:
     def _indent(self) -> None:
         """Increase indentation"""
         self.indent_level += 1
+        self._indent_str = _indentation(self.indent_level)
     
     def _dedent(self) -> None:
         """Decrease indentation"""
         self.indent_level = max(0, self.indent_level - 1)
+        self._indent_str = _INDENTS[self.indent_level]
+    
+    def _open_block(self, line: str) -> None:
+        """Emits the line opening a block and indents for its body"""
+        write = self.output.write
+        write(self._indent_str)
+        write(line)
+        write('\n')
+        self._indent()
+    
+    def _close_block(self, line: str = '}') -> None:
+        """Dedents and emits the line closing a block"""
+        self._dedent()
+        write = self.output.write
+        write(self._indent_str)
+        write(line)
+        write('\n')
     
     def _emit_program(self, program: Program) -> None:
         """Emits the program"""
@@ -92,10 +260,7 @@ class Transpiler:
         
         # User imports
         for imp in program.imports:
-            if imp.path.startswith('"') and imp.path.endswith('"'):
-                all_imports.add(imp.path)
-            else:
-                all_imports.add(f'"{imp.path}"')
+            all_imports.add(_quote_import(imp.path))
         
         # Required imports for exceptions
         if self.exception_types:
@@ -103,12 +268,10 @@ class Transpiler:
             all_imports.add('"errors"')
         
         if all_imports:
-            self._emit_line('import (')
-            self._indent()
+            self._open_block('import (')
             for imp_path in sorted(all_imports):
                 self._emit_line(imp_path)
-            self._dedent()
-            self._emit_line(')')
+            self._close_block(')')
             self._emit_line()
         
         # Generate types for exceptions (only if not in project mode)
@@ -130,96 +293,51 @@ class Transpiler:
     
     def _emit_exception_types(self) -> None:
         """Emits types for exceptions"""
-        self._emit_line('// Exception types')
-        self._emit_line('type Exception interface {')
-        self._indent()
-        self._emit_line('Error() string')
-        self._emit_line('Type() string')
-        self._dedent()
-        self._emit_line('}')
-        self._emit_line()
-        
-        self._emit_line('type BaseException struct {')
-        self._indent()
-        self._emit_line('message string')
-        self._emit_line('exType string')
-        self._dedent()
-        self._emit_line('}')
-        self._emit_line()
-        
-        self._emit_line('func (e *BaseException) Error() string {')
-        self._indent()
-        self._emit_line('return e.message')
-        self._dedent()
-        self._emit_line('}')
-        self._emit_line()
-        
-        self._emit_line('func (e *BaseException) Type() string {')
-        self._indent()
-        self._emit_line('return e.exType')
-        self._dedent()
-        self._emit_line('}')
-        self._emit_line()
-        
-        self._emit_line('func NewException(exType, message string) Exception {')
-        self._indent()
-        self._emit_line('return &BaseException{message: message, exType: exType}')
-        self._dedent()
-        self._emit_line('}')
+        # Emitted at top level, so the fixed text is written verbatim
+        self.output.write(_EXCEPTION_TYPES_GO)
     
     def _emit_declaration(self, decl: Declaration) -> None:
         """Emits declaration"""
-        if isinstance(decl, FuncDecl):
-            self._emit_func_decl(decl)
-        elif isinstance(decl, VarDecl):
-            self._emit_var_decl(decl)
-        elif isinstance(decl, ConstDecl):
-            self._emit_const_decl(decl)
-        elif isinstance(decl, TypeDecl):
-            self._emit_type_decl(decl)
-        elif isinstance(decl, StructDecl):
-            self._emit_struct_decl(decl)
-        elif isinstance(decl, InterfaceDecl):
-            self._emit_interface_decl(decl)
-        elif isinstance(decl, ClassDecl):
-            self._emit_class_decl(decl)
-        else:
+        handler = self._decl_dispatch[decl.KIND]
+        if handler is None:
             raise TranspilerError(f"Unsupported declaration: {type(decl)}")
+        handler(decl)
     
     def _emit_func_decl(self, decl: FuncDecl) -> None:
         """Emits function declaration"""
-        params = ', '.join(f'{p.name} {p.type}' for p in decl.params)
+        params = _format_params(decl.params)
         
         if decl.return_type:
-            self._emit_line(f'func {decl.name}({params}) {decl.return_type} {{')
+            self._open_block(f'func {decl.name}({params}) {decl.return_type} {{')
         else:
-            self._emit_line(f'func {decl.name}({params}) {{')
+            self._open_block(f'func {decl.name}({params}) {{')
         
-        self._indent()
         self._emit_block_stmt(decl.body)
-        self._dedent()
-        self._emit_line('}')
+        self._close_block()
     
     def _emit_var_decl(self, decl: VarDecl) -> None:
         """Emits variable declaration"""
-        if decl.type and decl.value:
-            value = self._expr_to_string(decl.value)
-            self._emit_line(f'var {decl.name} {decl.type} = {value}')
-        elif decl.type:
-            self._emit_line(f'var {decl.name} {decl.type}')
-        elif decl.value:
-            value = self._expr_to_string(decl.value)
-            self._emit_line(f'var {decl.name} = {value}')
-        else:
+        if not decl.type and not decl.value:
             raise TranspilerError("Variable must have type or value")
+        self._emit_line(self._format_var('var', decl.name, decl.type, decl.value))
     
     def _emit_const_decl(self, decl: ConstDecl) -> None:
         """Emits constant declaration"""
-        value = self._expr_to_string(decl.value)
-        if decl.type:
-            self._emit_line(f'const {decl.name} {decl.type} = {value}')
+        self._emit_line(self._format_var('const', decl.name, decl.type, decl.value))
+    
+    def _format_var(self, keyword: str, name: str, type_name: Optional[str], value: Optional[Expression],
+                    short: bool = False) -> str:
+        """Formats a var or const declaration; with short, an untyped one
+        with a value uses :="""
+        if value is None:
+            return f'{keyword} {name} {type_name}'
+        value_text = self._expr_to_string(value)
+        if type_name:
+            return f'{keyword} {name} {type_name} = {value_text}'
+        elif short:
+            return f'{name} := {value_text}'
         else:
-            self._emit_line(f'const {decl.name} = {value}')
+            return f'{keyword} {name} = {value_text}'
     
     def _emit_type_decl(self, decl: TypeDecl) -> None:
         """Emits type declaration"""
@@ -227,33 +345,28 @@ class Transpiler:
     
     def _emit_struct_decl(self, decl: StructDecl) -> None:
         """Emits struct declaration"""
-        self._emit_line(f'type {decl.name} struct {{')
-        self._indent()
+        self._open_block(f'type {decl.name} struct {{')
         for field in decl.fields:
             self._emit_line(f'{field.name} {field.type}')
-        self._dedent()
-        self._emit_line('}')
+        self._close_block()
     
     def _emit_interface_decl(self, decl: InterfaceDecl) -> None:
         """Emits interface declaration"""
-        self._emit_line(f'type {decl.name} interface {{')
-        self._indent()
+        self._open_block(f'type {decl.name} interface {{')
         for method in decl.methods:
-            params = ', '.join(f'{p.name} {p.type}' for p in method.params)
+            params = _format_params(method.params)
             if method.return_type:
                 self._emit_line(f'{method.name}({params}) {method.return_type}')
             else:
                 self._emit_line(f'{method.name}({params})')
-        self._dedent()
-        self._emit_line('}')
+        self._close_block()
     
     def _emit_class_decl(self, decl: ClassDecl) -> None:
         """Emits class declaration (converted to struct + methods)"""
         self.current_class = decl.name
         
         # Struct for the class
-        self._emit_line(f'type {decl.name} struct {{')
-        self._indent()
+        self._open_block(f'type {decl.name} struct {{')
         
         # Inheritance (embedding)
         if decl.extends:
@@ -267,8 +380,7 @@ class Transpiler:
             else:
                 self._emit_line(f'{field.name} {field.type}')
         
-        self._dedent()
-        self._emit_line('}')
+        self._close_block()
         self._emit_line()
         
         # Constructor
@@ -287,11 +399,10 @@ class Transpiler:
         
         self.current_class = None
     
-    def _emit_constructor(self, class_name: str, constructor: ConstructorDecl, fields: List[ClassField]) -> None:
+    def _emit_constructor(self, class_name: str, constructor: ConstructorDecl, fields: Tuple[ClassField, ...]) -> None:
         """Emits constructor"""
-        params = ', '.join(f'{p.name} {p.type}' for p in constructor.params)
-        self._emit_line(f'func New{class_name}({params}) *{class_name} {{')
-        self._indent()
+        params = _format_params(constructor.params)
+        self._open_block(f'func New{class_name}({params}) *{class_name} {{')
         
         self._emit_line(f'obj := &{class_name}{{}}')
         
@@ -303,7 +414,7 @@ class Transpiler:
         
         # Constructor body (replaces 'this' with 'obj')
         old_class = self.current_class
-        old_receiver = getattr(self, 'current_receiver', 'this')
+        old_receiver = self.current_receiver
         self.current_class = class_name
         self.current_receiver = 'obj'
         
@@ -314,13 +425,11 @@ class Transpiler:
         self.current_receiver = old_receiver
         
         self._emit_line('return obj')
-        self._dedent()
-        self._emit_line('}')
+        self._close_block()
     
-    def _emit_default_constructor(self, class_name: str, fields: List[ClassField]) -> None:
+    def _emit_default_constructor(self, class_name: str, fields: Tuple[ClassField, ...]) -> None:
         """Emits default constructor"""
-        self._emit_line(f'func New{class_name}() *{class_name} {{')
-        self._indent()
+        self._open_block(f'func New{class_name}() *{class_name} {{')
         
         self._emit_line(f'obj := &{class_name}{{}}')
         
@@ -331,22 +440,19 @@ class Transpiler:
                 self._emit_line(f'obj.{field.name} = {value}')
         
         self._emit_line('return obj')
-        self._dedent()
-        self._emit_line('}')
+        self._close_block()
     
-    def _emit_method(self, class_name: str, method: MethodDecl) -> None:
+    def _emit_method(self, class_name: str, method: FuncDecl) -> None:
         """Emits method"""
-        params = ', '.join(f'{p.name} {p.type}' for p in method.params)
+        params = _format_params(method.params)
         
         if method.return_type:
-            self._emit_line(f'func (this *{class_name}) {method.name}({params}) {method.return_type} {{')
+            self._open_block(f'func (this *{class_name}) {method.name}({params}) {method.return_type} {{')
         else:
-            self._emit_line(f'func (this *{class_name}) {method.name}({params}) {{')
+            self._open_block(f'func (this *{class_name}) {method.name}({params}) {{')
         
-        self._indent()
         self._emit_block_stmt(method.body)
-        self._dedent()
-        self._emit_line('}')
+        self._close_block()
     
     def _emit_block_stmt(self, block: BlockStmt) -> None:
         """Emits block of statements"""
@@ -355,198 +461,171 @@ class Transpiler:
     
     def _emit_statement(self, stmt: Statement) -> None:
         """Emits statement"""
-        if isinstance(stmt, BlockStmt):
-            self._emit_line('{')
-            self._indent()
-            self._emit_block_stmt(stmt)
-            self._dedent()
-            self._emit_line('}')
-        
-        elif isinstance(stmt, ExpressionStmt):
-            # Special handling for parent class constructor calls
-            if isinstance(stmt.expression, CallExpr) and isinstance(stmt.expression.function, SelectorExpr):
-                if isinstance(stmt.expression.function.object, SuperExpr):
-                    # super.ClassName(args) -> parent struct initialization
-                    parent_class = stmt.expression.function.field
-                    args = ', '.join(self._expr_to_string(arg) for arg in stmt.expression.args)
-                    receiver = getattr(self, 'current_receiver', 'this')
-                    self._emit_line(f'{receiver}.{parent_class} = *New{parent_class}({args})')
-                    return
-            
-            expr = self._expr_to_string(stmt.expression)
-            self._emit_line(expr)
-        
-        elif isinstance(stmt, VarStmt):
-            if stmt.type and stmt.value:
-                value = self._expr_to_string(stmt.value)
-                self._emit_line(f'var {stmt.name} {stmt.type} = {value}')
-            elif stmt.type:
-                self._emit_line(f'var {stmt.name} {stmt.type}')
-            elif stmt.value:
-                value = self._expr_to_string(stmt.value)
-                self._emit_line(f'{stmt.name} := {value}')
-            else:
-                raise TranspilerError("Variável deve ter tipo ou valor")
-        
-        elif isinstance(stmt, AssignStmt):
-            target = self._expr_to_string(stmt.target)
-            value = self._expr_to_string(stmt.value)
-            self._emit_line(f'{target} {stmt.operator} {value}')
-        
-        elif isinstance(stmt, IfStmt):
-            condition = self._expr_to_string(stmt.condition)
-            self._emit_line(f'if {condition} {{')
-            self._indent()
-            self._emit_statement(stmt.then_stmt)
-            self._dedent()
-            
-            if stmt.else_stmt:
-                self._emit_line('} else {')
-                self._indent()
-                self._emit_statement(stmt.else_stmt)
-                self._dedent()
-            
-            self._emit_line('}')
-        
-        elif isinstance(stmt, ForStmt):
-            parts = []
-            if stmt.init:
-                # For init, we need to capture as string
-                init_str = self._stmt_to_string(stmt.init)
-                parts.append(init_str)
-            else:
-                parts.append('')
-            
-            if stmt.condition:
-                parts.append(self._expr_to_string(stmt.condition))
-            else:
-                parts.append('')
-            
-            if stmt.update:
-                update_str = self._stmt_to_string(stmt.update)
-                parts.append(update_str)
-            else:
-                parts.append('')
-            
-            self._emit_line(f'for {"; ".join(parts)} {{')
-            self._indent()
-            self._emit_statement(stmt.body)
-            self._dedent()
-            self._emit_line('}')
-        
-        elif isinstance(stmt, RangeStmt):
-            if stmt.key and stmt.value:
-                iterable = self._expr_to_string(stmt.iterable)
-                self._emit_line(f'for {stmt.key}, {stmt.value} := range {iterable} {{')
-            elif stmt.key:
-                iterable = self._expr_to_string(stmt.iterable)
-                self._emit_line(f'for {stmt.key} := range {iterable} {{')
-            else:
-                iterable = self._expr_to_string(stmt.iterable)
-                self._emit_line(f'for range {iterable} {{')
-            
-            self._indent()
-            self._emit_statement(stmt.body)
-            self._dedent()
-            self._emit_line('}')
+        handler = self._stmt_dispatch[stmt.KIND]
+        if handler is None:
+            raise TranspilerError(f"Unsupported statement: {type(stmt)}")
+        handler(stmt)
+    
+    def _emit_block(self, stmt: BlockStmt) -> None:
+        """Emits nested block statement"""
+        self._open_block('{')
+        self._emit_block_stmt(stmt)
+        self._close_block()
+    
+    def _emit_expression_stmt(self, stmt: ExpressionStmt) -> None:
+        """Emits expression statement"""
+        # Special handling for parent class constructor calls
+        if isinstance(stmt.expression, CallExpr) and isinstance(stmt.expression.function, SelectorExpr):
+            if isinstance(stmt.expression.function.object, SuperExpr):
+                # super.ClassName(args) -> parent struct initialization
+                parent_class = stmt.expression.function.field
+                args = ', '.join(self._expr_to_string(arg) for arg in stmt.expression.args)
+                receiver = self.current_receiver
+                self._emit_line(f'{receiver}.{parent_class} = *New{parent_class}({args})')
+                return
+        
+        expr = self._expr_to_string(stmt.expression)
+        self._emit_line(expr)
+    
+    def _emit_var_stmt(self, stmt: VarDecl) -> None:
+        """Emits variable statement"""
+        if not stmt.type and not stmt.value:
+            raise TranspilerError("Variável deve ter tipo ou valor")
+        self._emit_line(self._format_var('var', stmt.name, stmt.type, stmt.value, short=True))
+    
+    def _emit_assign_stmt(self, stmt: AssignStmt) -> None:
+        """Emits assignment"""
+        target = self._expr_to_string(stmt.target)
+        value = self._expr_to_string(stmt.value)
+        self._emit_line(f'{target} {stmt.operator} {value}')
+    
+    def _emit_if_stmt(self, stmt: IfStmt) -> None:
+        """Emits if statement"""
+        condition = self._expr_to_string(stmt.condition)
+        self._open_block(f'if {condition} {{')
+        self._emit_statement(stmt.then_stmt)
         
-        elif isinstance(stmt, SwitchStmt):
-            if stmt.expression:
-                expr = self._expr_to_string(stmt.expression)
-                self._emit_line(f'switch {expr} {{')
-            else:
-                self._emit_line('switch {')
-            
-            self._indent()
-            
-            for case in stmt.cases:
-                values = ', '.join(self._expr_to_string(v) for v in case.values)
-                self._emit_line(f'case {values}:')
-                self._indent()
-                for case_stmt in case.body:
-                    self._emit_statement(case_stmt)
-                self._dedent()
-            
-            if stmt.default_case:
-                self._emit_line('default:')
-                self._indent()
-                for default_stmt in stmt.default_case.body:
-                    self._emit_statement(default_stmt)
-                self._dedent()
-            
+        if stmt.else_stmt:
             self._dedent()
-            self._emit_line('}')
+            self._open_block('} else {')
+            self._emit_statement(stmt.else_stmt)
         
-        elif isinstance(stmt, ReturnStmt):
-            if stmt.value:
-                value = self._expr_to_string(stmt.value)
-                self._emit_line(f'return {value}')
-            else:
-                self._emit_line('return')
+        self._close_block()
+    
+    def _emit_for_stmt(self, stmt: ForStmt) -> None:
+        """Emits for statement"""
+        parts = []
+        if stmt.init:
+            # For init, we need to capture as string
+            init_str = self._stmt_to_string(stmt.init)
+            parts.append(init_str)
+        else:
+            parts.append('')
         
-        elif isinstance(stmt, BreakStmt):
-            self._emit_line('break')
+        if stmt.condition:
+            parts.append(self._expr_to_string(stmt.condition))
+        else:
+            parts.append('')
         
-        elif isinstance(stmt, ContinueStmt):
-            self._emit_line('continue')
+        if stmt.update:
+            update_str = self._stmt_to_string(stmt.update)
+            parts.append(update_str)
+        else:
+            parts.append('')
         
-        elif isinstance(stmt, GoStmt):
-            call = self._expr_to_string(stmt.call)
-            self._emit_line(f'go {call}')
+        self._open_block(f'for {"; ".join(parts)} {{')
+        self._emit_statement(stmt.body)
+        self._close_block()
+    
+    def _emit_range_stmt(self, stmt: RangeStmt) -> None:
+        """Emits for range statement"""
+        if stmt.key and stmt.value:
+            iterable = self._expr_to_string(stmt.iterable)
+            self._open_block(f'for {stmt.key}, {stmt.value} := range {iterable} {{')
+        elif stmt.key:
+            iterable = self._expr_to_string(stmt.iterable)
+            self._open_block(f'for {stmt.key} := range {iterable} {{')
+        else:
+            iterable = self._expr_to_string(stmt.iterable)
+            self._open_block(f'for range {iterable} {{')
         
-        elif isinstance(stmt, DeferStmt):
-            call = self._expr_to_string(stmt.call)
-            self._emit_line(f'defer {call}')
+        self._emit_statement(stmt.body)
+        self._close_block()
+    
+    def _emit_switch_stmt(self, stmt: SwitchStmt) -> None:
+        """Emits switch statement"""
+        if stmt.expression:
+            expr = self._expr_to_string(stmt.expression)
+            self._open_block(f'switch {expr} {{')
+        else:
+            self._open_block('switch {')
         
-        elif isinstance(stmt, TryStmt):
-            self._emit_try_stmt(stmt)
+        for case in stmt.cases:
+            values = ', '.join(self._expr_to_string(v) for v in case.values)
+            self._open_block(f'case {values}:')
+            for case_stmt in case.body:
+                self._emit_statement(case_stmt)
+            self._dedent()
         
-        elif isinstance(stmt, ThrowStmt):
-            expr = self._expr_to_string(stmt.expression)
-            self._emit_line(f'panic({expr})')
+        if stmt.default_case:
+            self._open_block('default:')
+            for default_stmt in stmt.default_case.body:
+                self._emit_statement(default_stmt)
+            self._dedent()
         
+        self._close_block()
+    
+    def _emit_return_stmt(self, stmt: ReturnStmt) -> None:
+        """Emits return statement"""
+        if stmt.value:
+            value = self._expr_to_string(stmt.value)
+            self._emit_line(f'return {value}')
         else:
-            raise TranspilerError(f"Unsupported statement: {type(stmt)}")
+            self._emit_line('return')
+    
+    def _emit_break_stmt(self, stmt: BreakStmt) -> None:
+        """Emits break statement"""
+        self._emit_line('break')
+    
+    def _emit_continue_stmt(self, stmt: ContinueStmt) -> None:
+        """Emits continue statement"""
+        self._emit_line('continue')
+    
+    def _emit_go_stmt(self, stmt: GoStmt) -> None:
+        """Emits go statement"""
+        call = self._expr_to_string(stmt.call)
+        self._emit_line(f'go {call}')
+    
+    def _emit_defer_stmt(self, stmt: DeferStmt) -> None:
+        """Emits defer statement"""
+        call = self._expr_to_string(stmt.call)
+        self._emit_line(f'defer {call}')
+    
+    def _emit_throw_stmt(self, stmt: ThrowStmt) -> None:
+        """Emits throw statement (converted to panic)"""
+        expr = self._expr_to_string(stmt.expression)
+        self._emit_line(f'panic({expr})')
     
     def _emit_try_stmt(self, stmt: TryStmt) -> None:
         """Emits try statement (converted to defer/recover)"""
-        self.exception_types.add('Exception')
-        
         # Função anônima com defer/recover
-        self._emit_line('func() {')
-        self._indent()
+        self._open_block('func() {')
         
         # defer com recover
         if stmt.catch_blocks:
-            self._emit_line('defer func() {')
+            self.output.write(_render_template(_TRY_RECOVER, self.indent_level))
             self._indent()
-            self._emit_line('if r := recover(); r != nil {')
             self._indent()
             
-            # Converte recover para Exception
-            self._emit_line('var ex Exception')
-            self._emit_line('if e, ok := r.(Exception); ok {')
-            self._indent()
-            self._emit_line('ex = e')
-            self._dedent()
-            self._emit_line('} else {')
-            self._indent()
-            self._emit_line('ex = NewException("RuntimeError", fmt.Sprintf("%v", r))')
-            self._dedent()
-            self._emit_line('}')
-            self._emit_line()
-            
             # Catch blocks
             for i, catch in enumerate(stmt.catch_blocks):
                 if i > 0:
                     self._emit_line('} else ')
                 
                 if catch.exception_type:
-                    self._emit_line(f'if ex.Type() == "{catch.exception_type}" {{')
+                    self._open_block(f'if ex.Type() == "{catch.exception_type}" {{')
                 else:
-                    self._emit_line('if true {')
-                
-                self._indent()
+                    self._open_block('if true {')
                 
                 if catch.exception_var:
                     self._emit_line(f'{catch.exception_var} := ex')
@@ -554,97 +633,179 @@ class Transpiler:
                 self._emit_block_stmt(catch.body)
                 self._dedent()
             
-            self._emit_line('}')
             self._dedent()
-            self._emit_line('}')
             self._dedent()
-            self._emit_line('}()')
+            self.output.write(_render_template(_TRY_RECOVER_END, self.indent_level))
         
         # Finally block
         if stmt.finally_block:
-            self._emit_line('defer func() {')
-            self._indent()
+            self._open_block('defer func() {')
             self._emit_block_stmt(stmt.finally_block.body)
-            self._dedent()
-            self._emit_line('}()')
+            self._close_block('}()')
         
         # Try body
         self._emit_block_stmt(stmt.body)
         
-        self._dedent()
-        self._emit_line('}()')
+        self._close_block('}()')
     
     def _stmt_to_string(self, stmt: Statement) -> str:
         """Converts statement to string"""
-        if isinstance(stmt, VarStmt):
-            if stmt.type and stmt.value:
-                value = self._expr_to_string(stmt.value)
-                return f'var {stmt.name} {stmt.type} = {value}'
-            elif stmt.value:
-                value = self._expr_to_string(stmt.value)
-                return f'{stmt.name} := {value}'
-            else:
-                return f'var {stmt.name} {stmt.type}'
-        
-        elif isinstance(stmt, AssignStmt):
-            target = self._expr_to_string(stmt.target)
-            value = self._expr_to_string(stmt.value)
-            return f'{target} {stmt.operator} {value}'
-        
-        elif isinstance(stmt, ExpressionStmt):
-            return self._expr_to_string(stmt.expression)
-        
-        else:
+        handler = self._stmt_string_dispatch[stmt.KIND]
+        if handler is None:
             raise TranspilerError(f"Statement cannot be converted to string: {type(stmt)}")
+        return handler(stmt)
+    
+    def _var_stmt_to_string(self, stmt: VarDecl) -> str:
+        """Converts variable statement to string"""
+        return self._format_var('var', stmt.name, stmt.type, stmt.value, short=True)
+    
+    def _assign_stmt_to_string(self, stmt: AssignStmt) -> str:
+        """Converts assignment statement to string"""
+        target = self._expr_to_string(stmt.target)
+        value = self._expr_to_string(stmt.value)
+        return f'{target} {stmt.operator} {value}'
+    
+    def _expression_stmt_to_string(self, stmt: ExpressionStmt) -> str:
+        """Converts expression statement to string"""
+        return self._expr_to_string(stmt.expression)
     
     def _expr_to_string(self, expr: Expression) -> str:
         """Converts expression to string"""
-        if isinstance(expr, BinaryExpr):
-            left = self._expr_to_string(expr.left)
-            right = self._expr_to_string(expr.right)
-            return f'({left} {expr.operator} {right})'
-        
-        elif isinstance(expr, UnaryExpr):
-            operand = self._expr_to_string(expr.operand)
-            return f'{expr.operator}{operand}'
-        
-        elif isinstance(expr, CallExpr):
-            func = self._expr_to_string(expr.function)
-            args = ', '.join(self._expr_to_string(arg) for arg in expr.args)
-            return f'{func}({args})'
-        
-        elif isinstance(expr, IndexExpr):
-            obj = self._expr_to_string(expr.object)
-            index = self._expr_to_string(expr.index)
-            return f'{obj}[{index}]'
-        
-        elif isinstance(expr, SelectorExpr):
-            obj = self._expr_to_string(expr.object)
-            return f'{obj}.{expr.field}'
-        
-        elif isinstance(expr, Identifier):
-            return expr.name
-        
-        elif isinstance(expr, Literal):
-            if expr.type == 'string':
-                # Escape special characters
-                escaped = expr.value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n').replace('\t', '\\t')
-                return f'"{escaped}"'
-            elif expr.type == 'bool':
-                return 'true' if expr.value else 'false'
-            else:
-                return str(expr.value)
-        
-        elif isinstance(expr, NewExpr):
-            args = ', '.join(self._expr_to_string(arg) for arg in expr.args)
-            return f'New{expr.class_name}({args})'
-        
-        elif isinstance(expr, ThisExpr):
-            return getattr(self, 'current_receiver', 'this')
-        
-        elif isinstance(expr, SuperExpr):
-            # Super is not used directly in Go; embedding handles inheritance
-            return getattr(self, 'current_receiver', 'this')
-        
+        # Iterative post-order walk: operands are rendered onto texts before
+        # the expression combining them, so long chains (a + b + ..., or
+        # selectors and calls) need no Python recursion
+        leaf_dispatch = self._expr_dispatch
+        leaf = leaf_dispatch[expr.KIND]
+        if leaf is not None:
+            return leaf(expr)
+        
+        # Leaf operands are rendered in place when their expression is
+        # combined, so only compound operands go through the stack
+        operands_dispatch = self._operands_dispatch
+        combine_dispatch = self._combine_dispatch
+        texts: List[str] = []
+        stack: List[Tuple[Expression, Optional[Tuple[Tuple[Expression, int], ...]]]] = [(expr, None)]
+        while stack:
+            node, operands = stack.pop()
+            
+            # First visit: queue the compound operands before coming back
+            # to combine them
+            if operands is None:
+                split = operands_dispatch[node.KIND]
+                if split is None:
+                    raise TranspilerError(f"Unsupported expression: {type(node)}")
+                operands = split(node)
+                stack.append((node, operands))
+                for operand, _ in reversed(operands):
+                    if leaf_dispatch[operand.KIND] is None:
+                        stack.append((operand, None))
+                continue
+            
+            # Compound operands rendered, in order: parenthesize those that
+            # bind looser than their context
+            parts = []
+            start = len(texts)
+            for operand, _ in operands:
+                if leaf_dispatch[operand.KIND] is None:
+                    start -= 1
+            rendered = start
+            for operand, precedence in operands:
+                leaf = leaf_dispatch[operand.KIND]
+                if leaf is not None:
+                    parts.append(leaf(operand))
+                    continue
+                text = texts[rendered]
+                rendered += 1
+                parts.append(f'({text})' if precedence and _binds_looser(operand, precedence) else text)
+            del texts[start:]
+            texts.append(cast(Callable, combine_dispatch[node.KIND])(node, parts))
+        return texts[0]
+    
+    def _binary_operands(self, expr: BinaryExpr) -> Tuple[Tuple[Expression, int], ...]:
+        """Lists the operands of a binary expression with their context precedence"""
+        # Operators are left-associative, so the right operand also needs
+        # parentheses at equal precedence (unknown operators keep both)
+        precedence = _GO_PRECEDENCE.get(expr.operator)
+        if precedence is None:
+            return ((expr.left, _POSTFIX_PRECEDENCE), (expr.right, _POSTFIX_PRECEDENCE))
+        return ((expr.left, precedence), (expr.right, precedence + 1))
+    
+    def _binary_to_string(self, expr: BinaryExpr, parts: List[str]) -> str:
+        """Converts binary expression to string"""
+        return f'{parts[0]} {expr.operator} {parts[1]}'
+    
+    def _unary_operands(self, expr: UnaryExpr) -> Tuple[Tuple[Expression, int], ...]:
+        """Lists the operand of a unary expression with its context precedence"""
+        # Nested unary operators are parenthesized too, so -(-x) does not
+        # become the decrement token
+        return ((expr.operand, _POSTFIX_PRECEDENCE),)
+    
+    def _unary_to_string(self, expr: UnaryExpr, parts: List[str]) -> str:
+        """Converts unary expression to string"""
+        return f'{expr.operator}{parts[0]}'
+    
+    def _call_operands(self, expr: CallExpr) -> Tuple[Tuple[Expression, int], ...]:
+        """Lists the function and arguments of a call"""
+        return ((expr.function, _POSTFIX_PRECEDENCE), *[(arg, 0) for arg in expr.args])
+    
+    def _call_to_string(self, expr: CallExpr, parts: List[str]) -> str:
+        """Converts call expression to string"""
+        args = ', '.join(parts[1:])
+        return f'{parts[0]}({args})'
+    
+    def _index_operands(self, expr: IndexExpr) -> Tuple[Tuple[Expression, int], ...]:
+        """Lists the object and index of an index expression"""
+        return ((expr.object, _POSTFIX_PRECEDENCE), (expr.index, 0))
+    
+    def _index_to_string(self, expr: IndexExpr, parts: List[str]) -> str:
+        """Converts index expression to string"""
+        return f'{parts[0]}[{parts[1]}]'
+    
+    def _selector_operands(self, expr: SelectorExpr) -> Tuple[Tuple[Expression, int], ...]:
+        """Lists the object of a selector expression"""
+        return ((expr.object, _POSTFIX_PRECEDENCE),)
+    
+    def _selector_to_string(self, expr: SelectorExpr, parts: List[str]) -> str:
+        """Converts selector expression to string"""
+        return f'{parts[0]}.{expr.field}'
+    
+    def _identifier_to_string(self, expr: Identifier) -> str:
+        """Converts identifier to string"""
+        return expr.name
+    
+    def _literal_to_string(self, expr: Literal) -> str:
+        """Converts literal to string"""
+        # Literals are hash-consed by the parser, so each distinct one is
+        # rendered once and looked up by identity afterwards
+        text = self._literal_memo.get(id(expr))
+        if text is not None:
+            return text
+        
+        if expr.type == 'string':
+            # Escape special characters
+            escaped = expr.value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n').replace('\t', '\\t')
+            text = f'"{escaped}"'
+        elif expr.type == 'bool':
+            text = 'true' if expr.value else 'false'
         else:
-            raise TranspilerError(f"Unsupported expression: {type(expr)}")
+            text = str(expr.value)
+        self._literal_memo[id(expr)] = text
+        return text
+    
+    def _new_operands(self, expr: NewExpr) -> Tuple[Tuple[Expression, int], ...]:
+        """Lists the arguments of a new expression"""
+        return tuple([(arg, 0) for arg in expr.args])
+    
+    def _new_to_string(self, expr: NewExpr, parts: List[str]) -> str:
+        """Converts new expression to string"""
+        args = ', '.join(parts)
+        return f'New{expr.class_name}({args})'
+    
+    def _this_to_string(self, expr: ThisExpr) -> str:
+        """Converts this expression to string"""
+        return self.current_receiver
+    
+    def _super_to_string(self, expr: SuperExpr) -> str:
+        """Converts super expression to string"""
+        # Super is not used directly in Go; embedding handles inheritance
+        return self.current_receiver